@@ -1,30 +1,65 @@
+import os
+import asyncio
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from app.routers import image_gen_api, n8n_api, tts_api, caption_api, stt_api, tts_kokoro_api
 from jiment_ai_generator_async import JimengAIGenerator  # existing dependency
 from app.services.tts_service import TTSService
+from app.services.caption import Caption
+from app.services.kokoro_service import KokoroService
+
+# Number of warmed browser sessions; each one is a full Chromium instance
+GEN_POOL_SIZE = int(os.environ.get("GEN_POOL_SIZE", 1))
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Initialize long-lived services
-    app.state.gen = JimengAIGenerator()
-    await app.state.gen.start()
+    app.state.gens = []
+    app.state.gen_pool = asyncio.Queue()
+    app.state.gens_closed = False  # set by /image_gen/shutdown; later requests get a 503
+    try:
+        for _ in range(GEN_POOL_SIZE):
+            g = JimengAIGenerator()
+            await g.start()
+            app.state.gens.append(g)
+            app.state.gen_pool.put_nowait(g)
+    except BaseException:
+        # One failed to start: close the browsers that already did before giving up
+        for g in app.state.gens:
+            await g.close()
+        raise
+    # Snapshot for /image_gen/status; refreshed by the handlers that discover images
+    app.state.image_count = sum(len(g.all_images_src) for g in app.state.gens)
     app.state.tts = TTSService()  # thin async wrapper around your tts.synthesize_speech()
+    app.state.n8n_writer = n8n_api.JSONWriteBuffer()
+    app.state.caption = Caption()  # stateless, shared by all caption requests (no lock needed)
+    app.state.kokoro = KokoroService()  # one engine + worker thread per process
+    # Caps on in-flight heavy requests; extra callers wait here instead of piling up in thread pools
+    app.state.kokoro_sem = asyncio.Semaphore(2)
+    app.state.epub_sem = asyncio.Semaphore(4)
     try:
         yield
     finally:
-        await app.state.gen.close()
+        app.state.kokoro.close()
+        app.state.tts.close()
+        try:
+            await app.state.n8n_writer.close()
+        finally:
+            for g in app.state.gens:
+                await g.close()
 
 def create_app() -> FastAPI:
-    app = FastAPI(lifespan=lifespan, title="Media Automation API", version="1.0.0")
-    app.include_router(image_gen_api.router)
-    app.include_router(tts_api.router)
-    app.include_router(n8n_api.router)
-    app.include_router(caption_api.router)
-    app.include_router(stt_api.router)
-    app.include_router(tts_kokoro_api.router)
+    app = FastAPI(
+        lifespan=lifespan,
+        title="Media Automation API",
+        version="1.0.0",
+        default_response_class=ORJSONResponse,  # orjson encodes large chapter/caption lists much faster
+    )
+    for r in (image_gen_api, tts_api, n8n_api, caption_api, stt_api, tts_kokoro_api):
+        app.include_router(r.router)
     return app
 
 app = create_app()
 
-# Run with: uvicorn app.main:app --reload
\ No newline at end of file
+# Run with: uvicorn app.main:app --reload
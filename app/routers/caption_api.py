@@ -1,11 +1,13 @@
+import asyncio
 from pathlib import Path
 from typing import List, Literal, Optional, Tuple
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from fastapi.responses import FileResponse
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, TypeAdapter, field_validator
 
 
 from app.services.caption import Caption, convert_webvtt_to_ass  # adjust import path if needed
+from app.services.storage import _ALLOWED_OUTPUT
 
 router = APIRouter(prefix="/caption", tags=["Caption/Subtitle"])
 
@@ -15,6 +17,9 @@ class Segment(BaseModel):
     start_ts: float
     end_ts: float
 
+# Dumps the whole segment list in one pass instead of one .dict() per item
+_SEGMENTS_ADAPTER = TypeAdapter(List[Segment])
+
 class RenderSegmentsRequest(BaseModel):
     segments: List[Segment]
     width: int = 1920
@@ -80,8 +85,7 @@ def _safe_in_output(path: Optional[str]) -> Path:
     if not path:
         return _default_outfile()
     p = Path(path).resolve()
-    allowed = Path("./output").resolve()
-    if not str(p).startswith(str(allowed)):
+    if not p.is_relative_to(_ALLOWED_OUTPUT):
         raise HTTPException(status_code=403, detail="Output path must be under ./output")
     p.parent.mkdir(parents=True, exist_ok=True)
     return p
@@ -91,7 +95,9 @@ def _safe_in_output(path: Optional[str]) -> Path:
 @router.post("/convert_vtt", response_model=VTTConvertResponse)
 async def convert_vtt(req: VTTConvertRequest):
     outp = _safe_in_output(req.output_path)
-    convert_webvtt_to_ass(
+    # Parsing + file write are blocking; run them off the event loop
+    await asyncio.to_thread(
+        convert_webvtt_to_ass,
         vtt_text=req.vtt_text,
         output_path=str(outp),
         dimensions=(req.width, req.height),
@@ -112,12 +118,13 @@ async def convert_vtt(req: VTTConvertRequest):
     return VTTConvertResponse(ass_path=str(outp))
 
 @router.post("/render_segments", response_model=RenderSegmentsResponse)
-async def render_segments(req: RenderSegmentsRequest):
-    cp = Caption()
+async def render_segments(request: Request, req: RenderSegmentsRequest):
+    cp: Caption = request.app.state.caption
     outp = _safe_in_output(req.output_path)
-    segments = [s.dict() for s in req.segments]
+    segments = _SEGMENTS_ADAPTER.dump_python(req.segments)
 
-    cp.create_subtitle(
+    await asyncio.to_thread(
+        cp.create_subtitle,
         segments=segments,
         dimensions=(req.width, req.height),
         output_path=str(outp),
@@ -137,9 +144,11 @@ async def render_segments(req: RenderSegmentsRequest):
 @router.get("/file")
 async def get_file(path: str):
     p = Path(path).resolve()
-    allowed = Path("./output").resolve()
-    if not str(p).startswith(str(allowed)):
+    if not p.is_relative_to(_ALLOWED_OUTPUT):
         raise HTTPException(status_code=403, detail="Access denied")
-    if not p.exists():
+    # One stat, reused by FileResponse for Content-Length/ETag/Last-Modified
+    try:
+        st = p.stat()
+    except FileNotFoundError:
         raise HTTPException(status_code=404, detail="File not found")
-    return FileResponse(p)
+    return FileResponse(p, stat_result=st, headers={"Cache-Control": "public, max-age=3600"})
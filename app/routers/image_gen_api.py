@@ -1,40 +1,96 @@
-from fastapi import APIRouter, Request
+from fastapi import APIRouter, HTTPException, Request
 from app.models import PromptRequest, IndexRequest
 
 router = APIRouter(prefix="/image_gen", tags=["Generator"])
 
+async def acquire(request: Request):
+    # Wait for a free generator; each one is used by a single request at a time
+    g = await request.app.state.gen_pool.get()
+    if request.app.state.gens_closed:
+        # Pass the closed generator on so every other waiter wakes up and fails too
+        release(request, g)
+        raise HTTPException(status_code=503, detail="Generator has been shut down")
+    return g
+
+def release(request: Request, g):
+    request.app.state.gen_pool.put_nowait(g)
+
+def _update_image_count(request: Request):
+    # Only image discovery grows all_images_src; /status reads this int instead
+    request.app.state.image_count = sum(len(g.all_images_src) for g in request.app.state.gens)
+
 @router.post("/clean_prompt")
 async def clean_prompt(request: Request):
-    await request.app.state.gen.clean_prompt()
+    g = await acquire(request)
+    try:
+        await g.clean_prompt()
+    finally:
+        release(request, g)
     return {"status": "ok", "message": "Prompt cleaned"}
 
 @router.post("/prompt")
 async def add_prompt(request: Request, req: PromptRequest):
-    await request.app.state.gen.clean_prompt()
-    await request.app.state.gen.add_prompt(req.content)
+    g = await acquire(request)
+    try:
+        await g.clean_prompt()
+        await g.add_prompt(req.content)
+    finally:
+        release(request, g)
     return {"status": "ok", "message": "Prompt added", "prompt": req.content}
 
 @router.post("/submit")
 async def submit(request: Request):
-    await request.app.state.gen.click_submit()
+    g = await acquire(request)
+    try:
+        await g.click_submit()
+    finally:
+        release(request, g)
     return {"status": "ok", "message": "Submit button clicked"}
 
 @router.post("/download")
 async def download_image(request: Request, req: IndexRequest):
-    await request.app.state.gen.download_images(req.index)
+    g = await acquire(request)
+    try:
+        await g.download_images(req.index)
+    finally:
+        release(request, g)
     return {"status": "ok", "message": f"Download triggered for image {req.index}"}
 
 @router.post("/refresh_images")
 async def refresh_images(request: Request):
-    new_images = await request.app.state.gen.get_all_available_images()
+    g = await acquire(request)
+    try:
+        new_images = await g.get_all_available_images()
+    finally:
+        _update_image_count(request)
+        release(request, g)
     return {"status": "ok", "new_images": len(new_images)}
 
 @router.post("/download_new")
 async def download_new_images(request: Request):
-    new_images = await request.app.state.gen.download_new_images()
+    g = await acquire(request)
+    try:
+        new_images = await g.download_new_images()
+    finally:
+        _update_image_count(request)
+        release(request, g)
     return {"status": "ok", "new_images_downloaded": len(new_images)}
 
 @router.get("/status")
 async def status(request: Request):
-    img_count = len(request.app.state.gen.all_images_src)
-    return {"status": "ok", "images_downloaded": img_count}
\ No newline at end of file
+    # Lock-free: returns the last snapshot without touching generator state
+    return {"status": "ok", "images_downloaded": request.app.state.image_count}
+
+@router.post("/shutdown")
+async def shutdown(request: Request):
+    # Take every generator out of the pool so in-flight work finishes first
+    gens = [await acquire(request) for _ in request.app.state.gens]
+    request.app.state.gens_closed = True
+    try:
+        for g in gens:
+            await g.close()
+    finally:
+        # Back in the pool only to wake waiting requests; acquire() turns them away
+        for g in gens:
+            release(request, g)
+    return {"status": "ok", "message": "Generator closed."}
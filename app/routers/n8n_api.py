@@ -1,17 +1,18 @@
 from __future__ import annotations
 
-import os
 import json
-import tempfile
+import asyncio
+import orjson
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, BinaryIO, Dict, List
 
-from fastapi import APIRouter, UploadFile, File, HTTPException
+from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, Request
 from pydantic import RootModel
 
 import ebooklib
 from ebooklib import epub
-from bs4 import BeautifulSoup
+from lxml import html as lxml_html
+from loguru import logger
 
 router = APIRouter(prefix="/n8n", tags=["N8N IO"])
 
@@ -23,14 +24,18 @@ def _ensure_outdir() -> Path:
     return OUTPUT_ROOT
 
 
-def _safe_write_json(rel_filename: str, data: Any) -> str:
+def _safe_output_path(rel_filename: str) -> Path:
     outdir = _ensure_outdir()
     path = (outdir / rel_filename).resolve()
-    if not str(path).startswith(str(outdir)):
+    if not path.is_relative_to(outdir):
         raise HTTPException(status_code=403, detail="Invalid output path")
+    return path
+
+
+def _safe_write_json(rel_filename: str, data: Any) -> str:
+    path = _safe_output_path(rel_filename)
     path.parent.mkdir(parents=True, exist_ok=True)
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=4)
+    path.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
     return str(path)
 
 def _load_json(rel_filename: str) -> Any:
@@ -43,6 +48,78 @@ def _load_json(rel_filename: str) -> Any:
         raise HTTPException(status_code=400, detail="Invalid JSON format")
 
 
+class JSONWriteBuffer:
+    """
+    Write-behind buffer for the upload endpoints.
+
+    Payloads are kept in memory per file (last one wins, matching the old
+    overwrite semantics) and written out together once `delay` seconds have
+    passed since the first pending write, so a burst of n8n calls costs one
+    write per file instead of one per request.
+    """
+
+    def __init__(self, delay: float = 0.5):
+        self.delay = delay
+        self._pending: Dict[str, Any] = {}
+        self._lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+
+    def put(self, rel_filename: str, data: Any) -> str:
+        path = _safe_output_path(rel_filename)
+        self._pending[rel_filename] = data
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._flush_later())
+        return str(path)
+
+    def get(self, rel_filename: str, default: Any = None) -> Any:
+        return self._pending.get(rel_filename, default)
+
+    def __contains__(self, rel_filename: str) -> bool:
+        return rel_filename in self._pending
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.delay)
+        await self.flush()
+
+    async def flush(self):
+        """Write every pending payload; a file that fails to write is logged and stays pending."""
+        async with self._lock:
+            failed = set()
+            while True:
+                todo = [(k, v) for k, v in self._pending.items() if k not in failed]
+                if not todo:
+                    break
+                for rel_filename, data in todo:
+                    try:
+                        await asyncio.to_thread(_safe_write_json, rel_filename, data)
+                    except Exception:
+                        # The upload was already acknowledged; nobody else will see this error
+                        logger.exception("n8n buffered write failed for {}", rel_filename)
+                        failed.add(rel_filename)
+                        continue
+                    # A newer payload may have arrived while writing; keep it queued
+                    if self._pending.get(rel_filename) is data:
+                        del self._pending[rel_filename]
+
+    async def close(self):
+        """Stop the delayed flush and write out whatever is still pending."""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        await self.flush()
+
+
+def _load_buffered_json(request: Request, rel_filename: str) -> Any:
+    # Serve not-yet-flushed uploads so reads always see the latest write
+    writer: JSONWriteBuffer = request.app.state.n8n_writer
+    if rel_filename in writer:
+        return writer.get(rel_filename)
+    return _load_json(rel_filename)
+
+
 class GenericJSON(RootModel[Any]):
     """Accept arbitrary JSON payloads and echo back."""
     @property
@@ -50,35 +127,42 @@ class GenericJSON(RootModel[Any]):
         return self.root
 
 
+def _parse_epub_sync(fileobj: BinaryIO) -> List[Dict[str, str]]:
+    chapters: List[Dict[str, str]] = []
+    fileobj.seek(0)
+    book = epub.read_epub(fileobj)
+    for item in book.get_items_of_type(ebooklib.ITEM_DOCUMENT):
+        # Body bytes carry no charset declaration; decode so lxml doesn't assume latin-1
+        content = item.get_body_content().decode("utf-8", errors="replace")
+        if not content.strip():
+            chapters.append({"title": item.get_name(), "text": ""})
+            continue
+        doc = lxml_html.fromstring(content)
+        title_tag = doc.xpath("(//h1|//h2)[1]") or doc.xpath("//title[1]")
+        title = title_tag[0].text_content().strip() if title_tag else item.get_name()
+        text = " ".join(p.text_content().strip() for p in doc.xpath("//p"))
+        chapters.append({"title": title, "text": text})
+    return chapters
+
+
+def epub_slot(request: Request) -> asyncio.Semaphore:
+    return request.app.state.epub_sem
+
+
 @router.post("/parse_epub")
-async def parse_epub(file: UploadFile = File(...)) -> List[Dict[str, str]]:
+async def parse_epub(
+    file: UploadFile = File(...), sem: asyncio.Semaphore = Depends(epub_slot)
+) -> List[Dict[str, str]]:
     if not file.filename or not file.filename.lower().endswith(".epub"):
         raise HTTPException(status_code=400, detail="Please upload an .epub file")
 
-    # Save to a temp file, then use ebooklib to parse
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".epub") as tmp:
-        tmp_path = tmp.name
-        content = await file.read()
-        tmp.write(content)
+    async with sem:
+        # ebooklib opens the upload's spooled file directly as a zip; no temp-file copy.
+        # Parsing is CPU-bound and blocking; keep it off the event loop
+        chapters = await asyncio.to_thread(_parse_epub_sync, file.file)
 
-    chapters: List[Dict[str, str]] = []
-    try:
-        book = epub.read_epub(tmp_path)
-        for item in book.get_items_of_type(ebooklib.ITEM_DOCUMENT):
-            content = item.get_body_content()
-            soup = BeautifulSoup(content, "html.parser")
-            title_tag = soup.find(["h1", "h2"]) or soup.find("title")
-            title = title_tag.get_text(strip=True) if title_tag else item.get_name()
-            text = " ".join(p.get_text(strip=True) for p in soup.find_all("p"))
-            chapters.append({"title": title, "text": text})
-    finally:
-        try:
-            os.unlink(tmp_path)
-        except OSError:
-            pass
-
-    # Write to ./output/n8n/chapters.json
-    _safe_write_json("chapters.json", chapters)
+        # Write to ./output/n8n/chapters.json
+        _safe_write_json("chapters.json", chapters)
     return chapters
 
 @router.post("/get_chapters")
@@ -87,51 +171,51 @@ async def get_chapters() -> GenericJSON:
     return GenericJSON(root=data)
 
 @router.post("/upload_transcript")
-async def upload_json(payload: GenericJSON):
-    path = _safe_write_json("transcript_generated.json", payload.data)
+async def upload_json(request: Request, payload: GenericJSON):
+    path = request.app.state.n8n_writer.put("transcript_generated.json", payload.data)
     return {"status": "success", "path": path, "data": payload.data}
 
 # write a get function to retrieve the uploaded JSON data
 @router.get("/get_transcript")
-async def get_uploaded_json() -> GenericJSON:
-    data = _load_json("transcript_generated.json")
+async def get_uploaded_json(request: Request) -> GenericJSON:
+    data = _load_buffered_json(request, "transcript_generated.json")
     return GenericJSON(root=data)
 
 
 @router.post("/upload_kv_data")
-async def upload_kv_data(payload: GenericJSON):
-    path = _safe_write_json("kv_data.json", payload.data)
+async def upload_kv_data(request: Request, payload: GenericJSON):
+    path = request.app.state.n8n_writer.put("kv_data.json", payload.data)
     return {"status": "success", "path": path, "data": payload.data}
 
 @router.get("/get_kv_data")
-async def get_uploaded_kv_data() -> GenericJSON:
-    data = _load_json("kv_data.json")
+async def get_uploaded_kv_data(request: Request) -> GenericJSON:
+    data = _load_buffered_json(request, "kv_data.json")
     return GenericJSON(root=data)
 
 
 @router.post("/upload_kv_data_revised")
-async def upload_kv_data_revised(payload: GenericJSON):
-    path = _safe_write_json("kv_data_revised.json", payload.data)
+async def upload_kv_data_revised(request: Request, payload: GenericJSON):
+    path = request.app.state.n8n_writer.put("kv_data_revised.json", payload.data)
     return {"status": "success", "path": path, "data": payload.data}
 
 @router.get("/get_kv_data_revised")
-async def get_uploaded_kv_data_revised() -> GenericJSON:
-    data = _load_json("kv_data_revised.json")
+async def get_uploaded_kv_data_revised(request: Request) -> GenericJSON:
+    data = _load_buffered_json(request, "kv_data_revised.json")
     return GenericJSON(root=data)
 
 
 @router.post("/upload_data_w_prompt")
-async def upload_data_w_prompt(payload: GenericJSON):
-    path = _safe_write_json("data_w_prompt.json", payload.data)
+async def upload_data_w_prompt(request: Request, payload: GenericJSON):
+    path = request.app.state.n8n_writer.put("data_w_prompt.json", payload.data)
     return {"status": "success", "path": path, "data": payload.data}
 
 @router.get("/get_data_w_prompt")
-async def get_uploaded_data_w_prompt() -> GenericJSON:
-    data = _load_json("data_w_prompt.json")
+async def get_uploaded_data_w_prompt(request: Request) -> GenericJSON:
+    data = _load_buffered_json(request, "data_w_prompt.json")
     return GenericJSON(root=data)
 
 @router.get("/get_all_text_data")
-async def get_all_text_data() -> GenericJSON:
+async def get_all_text_data(request: Request) -> GenericJSON:
     '''
     To get all text data, including 
         transcript_generated
@@ -143,13 +227,13 @@ async def get_all_text_data() -> GenericJSON:
     #chapter_data = [{'transcript': e['transcript'], 'book_introduction': e['content'], 'title': e['title'], 'chapter_content_original': e['text']}
     #                         for e in _load_json("transcript_generated.json")]
     #kv_data = [e['json'] for e in  _load_json("kv_data.json")]
-    kv_data_revised = [e['json']['json'] for e in  _load_json("kv_data_revised.json")] 
+    kv_data_revised = [e['json']['json'] for e in  _load_buffered_json(request, "kv_data_revised.json")] 
     out_data = [
             {'title': key, 'transcript': value}
             for item in kv_data_revised
             for key, value in item.items()
         ]
-    data_w_prompt = _load_json("data_w_prompt.json")
+    data_w_prompt = _load_buffered_json(request, "data_w_prompt.json")
     for idx, e in enumerate(data_w_prompt):
         print(e)
         for k,v in e.items():
@@ -157,9 +241,9 @@ async def get_all_text_data() -> GenericJSON:
     return out_data
 
 @router.post("/save_tts_result")
-async def save_tts_result(payload: GenericJSON):
+async def save_tts_result(request: Request, payload: GenericJSON):
     """
     Save TTS result to a JSON file.
     """
-    path = _safe_write_json("tts_result.json", payload.data)
+    path = request.app.state.n8n_writer.put("tts_result.json", payload.data)
     return {"status": "success", "path": path, "data": payload.data}
\ No newline at end of file
@@ -3,6 +3,7 @@ from typing import List, Optional
 from fastapi import APIRouter, Request, HTTPException
 from fastapi.responses import FileResponse
 from pydantic import BaseModel, Field
+from app.services.storage import _ALLOWED_OUTPUT
 
 router = APIRouter(prefix="/stt", tags=["Speech-to-Text"])
 
@@ -53,9 +54,11 @@ async def transcribe(req: STTTranscribeRequest, request: Request):
 async def get_file(path: str):
     # Safe-ish file serving limited to ./output
     p = Path(path).resolve()
-    allowed = Path("./output").resolve()
-    if not str(p).startswith(str(allowed)):
+    if not p.is_relative_to(_ALLOWED_OUTPUT):
         raise HTTPException(status_code=403, detail="Access denied")
-    if not p.exists():
+    # One stat, reused by FileResponse for Content-Length/ETag/Last-Modified
+    try:
+        st = p.stat()
+    except FileNotFoundError:
         raise HTTPException(status_code=404, detail="File not found")
-    return FileResponse(p)
+    return FileResponse(p, stat_result=st, headers={"Cache-Control": "public, max-age=3600"})
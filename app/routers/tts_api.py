@@ -2,6 +2,7 @@ from pathlib import Path
 from fastapi import APIRouter, Request, HTTPException
 from fastapi.responses import FileResponse
 from app.models import TTSSynthesizeRequest, TTSSynthesizeResponse
+from app.services.storage import _ALLOWED_OUTPUT
 
 router = APIRouter(prefix="/tts", tags=["Text-to-Speech"])
 
@@ -16,9 +17,11 @@ async def synthesize(req: TTSSynthesizeRequest, request: Request):
 async def get_file(path: str):
     # Basic, safe-ish file serving limited to the /output directory
     p = Path(path).resolve()
-    allowed = Path("./output").resolve()
-    if not str(p).startswith(str(allowed)):
+    if not p.is_relative_to(_ALLOWED_OUTPUT):
         raise HTTPException(status_code=403, detail="Access denied")
-    if not p.exists():
+    # One stat, reused by FileResponse for Content-Length/ETag/Last-Modified
+    try:
+        st = p.stat()
+    except FileNotFoundError:
         raise HTTPException(status_code=404, detail="File not found")
-    return FileResponse(p)
\ No newline at end of file
+    return FileResponse(p, stat_result=st, headers={"Cache-Control": "public, max-age=3600"})
\ No newline at end of file
@@ -1,23 +1,23 @@
 # app/api/tts_kokoro.py
 from __future__ import annotations
 
-import json
+import asyncio
+import orjson
 from pathlib import Path
 from datetime import datetime
 from typing import Optional, Literal, List
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.responses import FileResponse
 from pydantic import BaseModel, Field
 
-# 关键：直接用你的 TTS 实现，而不是 request.app.state.tts
-from app.services.tts_kokoro import TTS, LANGUAGE_VOICE_MAP
+# 关键：使用 request.app.state.kokoro（Kokoro 实现），而不是 request.app.state.tts（Azure）
+from app.services.tts_kokoro import LANGUAGE_VOICE_MAP
+from app.services.kokoro_service import KokoroService
+from app.services.storage import _ALLOWED_OUTPUT
 
 router = APIRouter(prefix="/tts/kokoro", tags=["Kokoro TTS"])
 
-# 单例，避免重复加载权重
-_tts_engine = TTS()
-
 # ---------- Models ----------
 
 class KokoroSynthesizeRequest(BaseModel):
@@ -34,7 +34,7 @@ class KokoroSynthesizeResponse(BaseModel):
     path: str
     duration: float
     sample_rate: int = 24000
-    num_channels: int = 2
+    num_channels: int = 1
     captions_path: Optional[str] = None
     vtt_path: Optional[str] = None
 
@@ -42,32 +42,34 @@ class KokoroSynthesizeResponse(BaseModel):
 
 def _fmt_ts(ts: float) -> str:
     """seconds -> WebVTT timestamp (HH:MM:SS.mmm)"""
-    if ts < 0:
-        ts = 0.0
-    hours = int(ts // 3600)
-    minutes = int((ts % 3600) // 60)
-    seconds = int(ts % 60)
-    millis = int(round((ts - int(ts)) * 1000))
-    return f"{hours:02d}:{minutes:02d}:{seconds:02d}.{millis:03d}"
+    ms = max(0, int(round(ts * 1000)))
+    s, ms = divmod(ms, 1000)
+    m, s = divmod(s, 60)
+    h, m = divmod(m, 60)
+    return f"{h:02d}:{m:02d}:{s:02d}.{ms:03d}"
 
 def _write_vtt(captions: List[dict], vtt_path: Path) -> None:
     lines = ["WEBVTT", ""]
     for i, c in enumerate(captions, 1):
-        start_ts = _fmt_ts(float(c.get("start_ts", 0)))
-        end_ts = _fmt_ts(float(c.get("end_ts", 0)))
         text = str(c.get("text", "")).strip()
         if not text:
             continue
-        lines.append(str(i))
-        lines.append(f"{start_ts} --> {end_ts}")
-        lines.append(text)
-        lines.append("")  # blank line between cues
+        start_ts = _fmt_ts(float(c.get("start_ts", 0)))
+        end_ts = _fmt_ts(float(c.get("end_ts", 0)))
+        lines.extend((str(i), f"{start_ts} --> {end_ts}", text, ""))  # blank line between cues
     vtt_path.write_text("\n".join(lines), encoding="utf-8")
 
+def kokoro_slot(request: Request) -> asyncio.Semaphore:
+    return request.app.state.kokoro_sem
+
 # ---------- Routes ----------
 
 @router.post("/synthesize", response_model=KokoroSynthesizeResponse)
-async def kokoro_synthesize(req: KokoroSynthesizeRequest):
+async def kokoro_synthesize(
+    request: Request,
+    req: KokoroSynthesizeRequest,
+    sem: asyncio.Semaphore = Depends(kokoro_slot),
+):
     """
     Run Kokoro TTS and save outputs.
     根据 voice 自动选择 kokoro_english 或 kokoro_international。
@@ -94,14 +96,11 @@ async def kokoro_synthesize(req: KokoroSynthesizeRequest):
     captions_json_path = wav_path.with_suffix(".json")
     vtt_path = wav_path.with_suffix(".vtt")
 
-    # Run TTS（不再使用 request.app.state.tts）
+    # Run TTS（在 lifespan 创建的专用线程上执行，不阻塞事件循环）
+    kokoro: KokoroService = request.app.state.kokoro
     try:
-        if lang_code == "a":
-            # 英文：带逐 token 时间戳
-            captions, duration = _tts_engine.kokoro_english(text, str(wav_path), voice=voice, speed=req.speed)
-        else:
-            # 国际化（中文等）：按句子级别时间戳
-            captions, duration = _tts_engine.kokoro_international(
+        async with sem:
+            captions, duration = await kokoro.synthesize(
                 text, str(wav_path), voice=voice, lang_code=lang_code, speed=req.speed
             )
     except Exception as e:
@@ -117,9 +116,7 @@ async def kokoro_synthesize(req: KokoroSynthesizeRequest):
     saved_vtt = None
     try:
         if req.save_captions_json:
-            captions_json_path.write_text(
-                json.dumps(captions, ensure_ascii=False, indent=2), encoding="utf-8"
-            )
+            captions_json_path.write_bytes(orjson.dumps(captions, option=orjson.OPT_INDENT_2))
             saved_captions = str(captions_json_path)
         if req.save_vtt:
             _write_vtt(captions, vtt_path)
@@ -133,7 +130,7 @@ async def kokoro_synthesize(req: KokoroSynthesizeRequest):
         path=str(wav_path),
         duration=float(duration),
         sample_rate=24000,
-        num_channels=2,
+        num_channels=1,
         captions_path=saved_captions,
         vtt_path=saved_vtt,
     )
@@ -142,9 +139,11 @@ async def kokoro_synthesize(req: KokoroSynthesizeRequest):
 @router.get("/file")
 async def get_file(path: str):
     p = Path(path).resolve()
-    allowed = Path("./output").resolve()
-    if not str(p).startswith(str(allowed)):
+    if not p.is_relative_to(_ALLOWED_OUTPUT):
         raise HTTPException(status_code=403, detail="Access denied")
-    if not p.exists():
+    # One stat, reused by FileResponse for Content-Length/ETag/Last-Modified
+    try:
+        st = p.stat()
+    except FileNotFoundError:
         raise HTTPException(status_code=404, detail="File not found")
-    return FileResponse(p)
+    return FileResponse(p, stat_result=st, headers={"Cache-Control": "public, max-age=3600"})
@@ -1,9 +1,23 @@
-from app.services.media import MediaUtils
+from __future__ import annotations
+
+import functools
 import os
+from concurrent.futures import ProcessPoolExecutor
 import re
-import pathlib
+import subprocess
+import tempfile
 import time
-from loguru import logger
+from typing import TYPE_CHECKING
+
+# loguru (and MediaUtils, which pulls it in) are imported where they are used so that
+# importing this module stays cheap for services that never render video
+if TYPE_CHECKING:
+    from app.services.media import MediaUtils
+
+_IS_WINDOWS = os.name == "nt"
+_WIN_DRIVE_RE = re.compile(r"^([A-Za-z]):")
+# Filtergraph-level escapes for force_style, applied in a single pass
+_FORCE_STYLE_TRANS = str.maketrans({",": r"\,", ":": r"\:"})
 
 
 def _ffpath(p: str) -> str:
@@ -17,23 +31,122 @@ def _ffsub_path(p: str) -> str:
     - absolute + forward slashes
     - escape drive-colon: C: -> C\:
     """
-    posix = pathlib.Path(p).absolute().as_posix()
-    if os.name == "nt":
-        posix = re.sub(r"^([A-Za-z]):", r"\1\\:", posix)
+    posix = _ffpath(p)
+    if _IS_WINDOWS:
+        posix = _WIN_DRIVE_RE.sub(r"\1\\:", posix)
     return posix
 
 
+@functools.lru_cache(maxsize=None)
+def _ffmpeg_encoders(ffmpeg_path: str) -> frozenset[str]:
+    """Names of the encoders this ffmpeg build provides (probed once per binary)."""
+    try:
+        out = subprocess.run(
+            [ffmpeg_path, "-hide_banner", "-encoders"],
+            capture_output=True, text=True, timeout=10,
+        ).stdout
+    except (OSError, subprocess.SubprocessError):
+        return frozenset()
+    names = set()
+    for line in out.splitlines():
+        parts = line.split()
+        # encoder rows look like: " V....D h264_nvenc   NVIDIA NVENC H.264 encoder"
+        if len(parts) >= 2 and len(parts[0]) == 6:
+            names.add(parts[1])
+    return frozenset(names)
+
+
+# Ken Burns zoompan expressions per direction, shared with the slideshow builder. Zoom is
+# the closed form of the accumulated `zoom+zf` (frame `on` is zoomed on+1 times), not a
+# recurrence over frames.
+_ZOOM_TEMPLATES = {
+    "zoom-to-top": "z='1+{zf}*(on+1)':x=iw/2-(iw/zoom/2):y=0",
+    "zoom-to-center": "z='1+{zf}*(on+1)':x=iw/2-(iw/zoom/2):y=ih/2-(ih/zoom/2)",
+    "zoom-to-top-left": "z='1+{zf}*(on+1)':x=0:y=0",
+}
+
+
+def _execute_builder(builder: "VideoBuilder", threads: int = 0) -> bool:
+    """Process-pool entry point (must be module-level to be picklable).
+
+    `threads` is applied to the worker's unpickled copy, never the caller's builder.
+    """
+    if threads and not builder.threads:
+        builder.threads = threads
+    return builder.execute()
+
+
 class VideoBuilder:
     """
     Builder class for constructing FFmpeg video commands with a fluent interface.
     """
 
-    def __init__(self, dimensions: tuple[int, int], ffmpeg_path="ffmpeg"):
+    # Output pad of the video chain. The chain has a single video input, so its input pad
+    # needs no label: ffmpeg feeds it the first (only) unused video stream, i.e. input 0.
+    _L_OUT = "[o]"
+
+    # Fixed pieces of every command
+    _BASE_FLAGS = ("-y", "-hide_banner", "-loglevel", "level+info")
+    _VIDEO_CODEC = ("-c:v", "libx264", "-preset", "ultrafast", "-crf", "23", "-pix_fmt", "yuv420p")
+    _AUDIO_CODEC = ("-c:a", "aac", "-b:a", "192k")
+
+    # Filtergraphs longer than this go through -filter_complex_script to stay clear of argv limits
+    _MAX_INLINE_FILTER = 100_000
+
+    # Ken Burns zoompan expressions, filled with the zoom factor per build
+    _ZOOM_TEMPLATES = _ZOOM_TEMPLATES
+    _SPEED_MULT = {"slow": 0.5, "normal": 1.0, "fast": 2.0}
+    # Image effect -> builder method; anything else is a plain scale
+    _EFFECT_BUILDERS = {"ken_burns": "_build_ken_burns", "pan": "_build_pan"}
+    # hwaccel name -> (ffmpeg encoder, video codec args); "auto" tries them in this order
+    _HW_ENCODERS = {
+        "nvenc": ("h264_nvenc", ("-c:v", "h264_nvenc", "-preset", "p1", "-cq", "23", "-pix_fmt", "yuv420p")),
+        "qsv": ("h264_qsv", ("-c:v", "h264_qsv", "-preset", "veryfast", "-global_quality", "23", "-pix_fmt", "nv12")),
+        "vaapi": ("h264_vaapi", ("-c:v", "h264_vaapi", "-qp", "23")),
+    }
+    _VAAPI_DEVICE = "/dev/dri/renderD128"
+
+    # ffprobe results shared by all builders, keyed by (kind, abspath, size, mtime)
+    _PROBE_CACHE: dict[tuple[str, str, int, float], dict] = {}
+    _PROBE_CACHE_MAX = 256
+    # Pan direction -> (start_x, end_x, start_y, end_y) from (scaled_w, scaled_h, w, h)
+    _PAN_DIRS = {
+        "left-to-right": lambda sw, sh, w, h: (0, sw - w, (sh - h) // 2, (sh - h) // 2),
+        "right-to-left": lambda sw, sh, w, h: (sw - w, 0, (sh - h) // 2, (sh - h) // 2),
+        "top-to-bottom": lambda sw, sh, w, h: ((sw - w) // 2, (sw - w) // 2, 0, sh - h),
+        "bottom-to-top": lambda sw, sh, w, h: ((sw - w) // 2, (sw - w) // 2, sh - h, 0),
+    }
+
+    # (predicate, message) pairs checked in order; a predicate returning True is an error.
+    # Each depends only on the key used by _validate(), so passing results can be memoized.
+    _VALIDATION_RULES = (
+        (lambda b: not b.background, "Background must be set (image or video)."),
+        (lambda b: not b.audio_file and not b.captions,
+         "At least one of audio_file or captions must be provided."),
+        (lambda b: b.background["type"] == "image" and not b.audio_file,
+         "Audio file must be provided if background is an image."),
+        (lambda b: b.background["type"] == "video" and not b.audio_file and b.captions is None,
+         "Audio file or captions must be provided if background is a video."),
+    )
+
+    def __init__(
+        self,
+        dimensions: tuple[int, int],
+        ffmpeg_path="ffmpeg",
+        report: bool = False,
+        threads: int = 0,
+        hwaccel: str | None = None,
+    ):
         if not isinstance(dimensions, tuple) or len(dimensions) != 2:
             raise ValueError("Dimensions must be a tuple of (width, height).")
 
         self.width, self.height = dimensions
         self.ffmpeg_path = ffmpeg_path
+        self.report = report  # -report writes a full ffmpeg log file per run; opt-in for debugging
+        # Encoder/filter threads; 0 = use all cores. Cap it when several renders run side by side.
+        self.threads = threads
+        # Hardware H.264 encoder: "nvenc", "qsv", "vaapi" or "auto"; falls back to libx264 if missing
+        self.hwaccel = hwaccel
 
         # Components
         self.background = None
@@ -43,6 +156,9 @@ class VideoBuilder:
 
         # Internal state
         self.media_utils: MediaUtils | None = None
+        self._tmp_files: list[str] = []
+        self._last_outdir: str | None = None
+        self._validated_key: tuple | None = None
 
     def set_media_utils(self, media_utils: MediaUtils):
         """Set the media manager for duration calculations."""
@@ -93,15 +209,114 @@ class VideoBuilder:
     def set_output_path(self, output_path: str):
         """Set output file path and ensure directory exists."""
         self.output_path = output_path
-        out_dir = os.path.dirname(os.path.abspath(output_path)) or "."
-        os.makedirs(out_dir, exist_ok=True)
+        self._ensure_outdir()
         return self
 
-    def _build_subtitles_filter(self) -> tuple[str, str] | None:
+    def _ensure_outdir(self):
+        """Create the output directory, skipping the syscalls if it was already created."""
+        out_dir = os.path.dirname(os.path.abspath(self.output_path)) or "."
+        if out_dir == self._last_outdir:
+            return
+        os.makedirs(out_dir, exist_ok=True)
+        self._last_outdir = out_dir
+
+    def _probe(self, kind: str, path: str) -> dict:
+        """ffprobe via MediaUtils, cached across builders while the file is unchanged."""
+        probe = (
+            self.media_utils.get_audio_info if kind == "audio" else self.media_utils.get_video_info
+        )
+        try:
+            st = os.stat(path)
+        except OSError:
+            # Let MediaUtils report the problem; nothing stable to key on
+            return probe(path)
+        key = (kind, os.path.abspath(path), st.st_size, st.st_mtime)
+        cache = VideoBuilder._PROBE_CACHE
+        info = cache.get(key)
+        if info is None:
+            info = probe(path)
+            if info:
+                if len(cache) >= self._PROBE_CACHE_MAX:
+                    cache.pop(next(iter(cache)))
+                cache[key] = info
+        return info
+
+    def _probe_audio(self, path: str) -> dict:
+        return self._probe("audio", path)
+
+    def _probe_video(self, path: str) -> dict:
+        return self._probe("video", path)
+
+    def _resolve_hwaccel(self) -> str | None:
+        """Pick the requested hardware encoder if this ffmpeg build has it."""
+        if not self.hwaccel:
+            return None
+        candidates = list(self._HW_ENCODERS) if self.hwaccel == "auto" else [self.hwaccel]
+        available = _ffmpeg_encoders(self.ffmpeg_path)
+        for name in candidates:
+            enc = self._HW_ENCODERS.get(name)
+            if enc and enc[0] in available:
+                return name
+        from loguru import logger
+
+        logger.bind(hwaccel=self.hwaccel).warning("hardware encoder not available, using libx264")
+        return None
+
+    @staticmethod
+    def _hold_frame(audio_duration: float, fps: int) -> str:
+        """Repeat the single decoded frame at `fps` for `audio_duration` seconds, inside the graph."""
+        return f"loop=loop=-1:size=1:start=0,setpts=N/({fps}*TB),trim=duration={audio_duration}"
+
+    def _build_ken_burns(self, effect_config: dict, audio_duration: float, fps: int) -> str:
+        zoom_factor = effect_config.get("zoom_factor", 0.001)
+        direction = effect_config.get("direction", "zoom-to-top-left")
+        zoom_expr = self._ZOOM_TEMPLATES.get(
+            direction, self._ZOOM_TEMPLATES["zoom-to-top-left"]
+        ).format(zf=zoom_factor)
+        zoompan_d = int(audio_duration * fps) + 1
+        return (
+            f"scale={self.width}:-2,setsar=1:1,"
+            f"crop={self.width}:{self.height},"
+            f"zoompan={zoom_expr}:d={zoompan_d}:s={self.width}x{self.height}:fps={fps}"
+        )
+
+    def _build_pan(self, effect_config: dict, audio_duration: float, fps: int) -> str:
+        direction = effect_config.get("direction", "left-to-right")
+        speed = effect_config.get("speed", "normal")
+        speed_mult = self._SPEED_MULT.get(speed, 1.0)
+
+        scale_factor = 1.3
+        scaled_width = int(self.width * scale_factor)
+        scaled_height = int(self.height * scale_factor)
+
+        pan_dir = self._PAN_DIRS.get(direction, self._PAN_DIRS["left-to-right"])
+        start_x, end_x, start_y, end_y = pan_dir(scaled_width, scaled_height, self.width, self.height)
+
+        # Per-frame step precomputed here, so crop evaluates one multiply by frame number n
+        total_frames = max(1, int(audio_duration * fps))
+        step_x = (end_x - start_x) * speed_mult / total_frames
+        step_y = (end_y - start_y) * speed_mult / total_frames
+        pan_x_expr = f"{start_x}+{step_x:.6g}*n"
+        pan_y_expr = f"{start_y}+{step_y:.6g}*n"
+
+        return (
+            f"scale={scaled_width}:{scaled_height},setsar=1:1,"
+            f"{self._hold_frame(audio_duration, fps)},"
+            f"crop={self.width}:{self.height}:{pan_x_expr}:{pan_y_expr}"
+        )
+
+    def _build_plain(self, effect_config: dict = None, audio_duration: float = None, fps: int = None) -> str:
+        chain = f"scale={self.width}:{self.height},setsar=1:1"
+        if audio_duration and fps:
+            # still image: scale once, then repeat the frame
+            chain += f",{self._hold_frame(audio_duration, fps)}"
+        return chain
+
+    def _build_subtitles_filter(self) -> str | None:
         """
-        Build subtitles filter string and output label.
+        Build the subtitles filter, to be appended to the background chain.
         Returns:
-            (filter_chain, out_label) or None if no captions
+            "subtitles=..." or None if no captions
         """
         if not self.captions:
             return None
@@ -120,60 +335,60 @@ class VideoBuilder:
 
         force_style = self.captions.get("force_style")
         if force_style:
-            # escape commas to avoid splitting into multiple args
-            safe_style = force_style.replace(",", r"\,")
+            # escape separators to avoid splitting into multiple filters/args
+            safe_style = force_style.translate(_FORCE_STYLE_TRANS)
             opts.append(f"force_style='{safe_style}'")
 
         arg = ":".join(opts)
-
-        # Input [bg], output [v]
-        chain = f"[bg]subtitles={arg}[v]"
-        return chain, "[v]"
-
-    def build_command(self):
-        """Build the complete FFmpeg command."""
-        if not self.background:
-            raise ValueError("Background must be set (image or video).")
-
-        if not self.audio_file and not self.captions:
-            raise ValueError("At least one of audio_file or captions must be provided.")
-
-        # Validate combinations
-        if self.background["type"] == "image" and not self.audio_file:
-            raise ValueError("Audio file must be provided if background is an image.")
-
-        if (
-            self.background["type"] == "video"
-            and not self.audio_file
-            and self.captions is None
-        ):
-            raise ValueError("Audio file or captions must be provided if background is a video.")
-
-        # Get audio duration if audio file is provided
-        audio_duration = None
-        if self.audio_file:
+        return f"subtitles={arg}"
+
+    def _validate(self):
+        """Raise ValueError for an incomplete setup; skipped when this configuration already passed."""
+        key = (
+            self.background["type"] if self.background else None,
+            bool(self.audio_file),
+            self.captions is not None,
+        )
+        if key == self._validated_key:
+            return
+        for is_invalid, message in self._VALIDATION_RULES:
+            if is_invalid(self):
+                raise ValueError(message)
+        self._validated_key = key
+
+    def _resolve_audio_duration(self, audio_duration: float | None) -> float | None:
+        """Probe the audio duration unless the caller already has it."""
+        if self.audio_file and audio_duration is None:
             if not self.media_utils:
                 raise ValueError("Media manager must be set to determine audio duration.")
-            media_info = self.media_utils.get_audio_info(self.audio_file)
+            media_info = self._probe_audio(self.audio_file)
             audio_duration = media_info.get("duration")
             if not audio_duration:
                 raise ValueError("Could not determine audio duration")
+        return audio_duration
 
-        # Ensure output directory exists
-        out_dir = os.path.dirname(os.path.abspath(self.output_path)) or "."
-        os.makedirs(out_dir, exist_ok=True)
-
-        # Base command with useful logging
-        cmd = [
-            self.ffmpeg_path,
-            "-y",
-            "-hide_banner",
-            "-loglevel", "level+info",
-            "-report",
-        ]
+    def _expected_duration(self) -> float | None:
+        """Output duration for progress reporting (audio if set, else the background video)."""
+        if self.audio_file:
+            return self._probe_audio(self.audio_file).get("duration")
+        if self.background and self.background.get("type") == "video":
+            return self._probe_video(self.background["file"]).get("duration")
+        return None
+
+    def _global_args(self, hw: str | None) -> list[str]:
+        """ffmpeg binary and the options that precede the inputs."""
+        cmd = [self.ffmpeg_path, *self._BASE_FLAGS]
+        if self.report:
+            cmd.append("-report")
+        if hw == "vaapi":
+            cmd.extend(["-vaapi_device", self._VAAPI_DEVICE])
+        filter_threads = self.threads or os.cpu_count() or 4
+        cmd.extend(["-filter_complex_threads", str(filter_threads), "-filter_threads", str(filter_threads)])
+        return cmd
 
-        filter_parts = []
-        input_index = 0
+    def _inputs_and_chain(self, audio_duration: float | None, hw: str | None) -> tuple[list[str], str]:
+        """Input arguments (background, then audio if set) and the unlabelled video chain."""
+        inputs = []
         fps = 25
 
         # Background input
@@ -181,12 +396,9 @@ class VideoBuilder:
             if audio_duration is None:
                 raise ValueError("Audio duration is required for image background.")
 
-            cmd.extend([
-                "-loop", "1",
-                "-t", str(audio_duration),
-                "-r", str(fps),
-                "-i", self.background["file"],
-            ])
+            # Decode the still exactly once; the effect chain generates every output frame
+            # (zoompan from its single input frame, pan/plain via _hold_frame after scaling)
+            inputs.extend(["-i", self.background["file"]])
 
             effect_config = self.background.get("effect_config", {"effect": "ken_burns"})
             if "ken_burns" in self.background and "effect_config" not in self.background:
@@ -198,125 +410,194 @@ class VideoBuilder:
                 }
 
             effect_type = effect_config.get("effect", "ken_burns")
-            duration_frames = int(audio_duration * fps)
-
-            if effect_type == "ken_burns":
-                zoom_factor = effect_config.get("zoom_factor", 0.001)
-                direction = effect_config.get("direction", "zoom-to-top-left")
-                zoom_expressions = {
-                    "zoom-to-top": f"z='zoom+{zoom_factor}':x=iw/2-(iw/zoom/2):y=0",
-                    "zoom-to-center": f"z='zoom+{zoom_factor}':x=iw/2-(iw/zoom/2):y=ih/2-(ih/zoom/2)",
-                    "zoom-to-top-left": f"z='zoom+{zoom_factor}':x=0:y=0",
-                }
-                zoom_expr = zoom_expressions.get(direction, zoom_expressions["zoom-to-top-left"])
-                zoompan_d = duration_frames + 1
-                filter_parts.append(
-                    f"[{input_index}]scale={self.width}:-2,setsar=1:1,"
-                    f"crop={self.width}:{self.height},"
-                    f"zoompan={zoom_expr}:d={zoompan_d}:s={self.width}x{self.height}:fps={fps}[bg]"
-                )
-
-            elif effect_type == "pan":
-                direction = effect_config.get("direction", "left-to-right")
-                speed = effect_config.get("speed", "normal")
-                speed_multipliers = {"slow": 0.5, "normal": 1.0, "fast": 2.0}
-                speed_mult = speed_multipliers.get(speed, 1.0)
-
-                scale_factor = 1.3
-                scaled_width = int(self.width * scale_factor)
-                scaled_height = int(self.height * scale_factor)
-
-                if direction == "left-to-right":
-                    start_x = 0
-                    end_x = scaled_width - self.width
-                    start_y = (scaled_height - self.height) // 2
-                    end_y = start_y
-                elif direction == "right-to-left":
-                    start_x = scaled_width - self.width
-                    end_x = 0
-                    start_y = (scaled_height - self.height) // 2
-                    end_y = start_y
-                elif direction == "top-to-bottom":
-                    start_x = (scaled_width - self.width) // 2
-                    end_x = start_x
-                    start_y = 0
-                    end_y = scaled_height - self.height
-                elif direction == "bottom-to-top":
-                    start_x = (scaled_width - self.width) // 2
-                    end_x = start_x
-                    start_y = scaled_height - self.height
-                    end_y = 0
-                else:
-                    start_x = 0
-                    end_x = scaled_width - self.width
-                    start_y = (scaled_height - self.height) // 2
-                    end_y = start_y
-
-                pan_x_expr = f"{start_x}+({end_x}-{start_x})*t/{audio_duration}*{speed_mult}"
-                pan_y_expr = f"{start_y}+({end_y}-{start_y})*t/{audio_duration}*{speed_mult}"
-
-                filter_parts.append(
-                    f"[{input_index}]scale={scaled_width}:{scaled_height},setsar=1:1,"
-                    f"crop={self.width}:{self.height}:{pan_x_expr}:{pan_y_expr}[bg]"
-                )
-
-            else:
-                filter_parts.append(
-                    f"[{input_index}]scale={self.width}:{self.height},setsar=1:1[bg]"
-                )
+            build_effect = getattr(self, self._EFFECT_BUILDERS.get(effect_type, "_build_plain"))
+            bg_chain = build_effect(effect_config, audio_duration, fps)
 
         elif self.background["type"] == "video":
-            cmd.extend(["-i", self.background["file"]])
-            filter_parts.append(f"[{input_index}]scale={self.width}:{self.height},setsar=1:1[bg]")
-
-        input_index += 1
-        current_video_label = "[bg]"
+            inputs.extend(["-i", self.background["file"]])
+            bg_chain = self._build_plain()
 
         # Audio input
-        audio_input_index = None
         if self.audio_file:
-            cmd.extend(["-i", self.audio_file])
-            audio_input_index = input_index
-            input_index += 1
-
-        # Subtitles
-        sub_chain = self._build_subtitles_filter()
-        if sub_chain:
-            chain, out_label = sub_chain
-            filter_parts.append(chain)
-            current_video_label = out_label  # "[v]"
-
-        # filter_complex
-        if filter_parts:
-            cmd.extend(["-filter_complex", ";".join(filter_parts)])
-
+            inputs.extend(["-i", self.audio_file])
+
+        # Subtitles are burned in as the last filter of the same chain (no extra labelled hop)
+        sub_filter = self._build_subtitles_filter()
+        if sub_filter:
+            bg_chain = f"{bg_chain},{sub_filter}"
+        if hw == "vaapi":
+            # Filters run on the CPU; upload the finished frames for the VAAPI encoder
+            bg_chain = f"{bg_chain},format=nv12,hwupload"
+        return inputs, bg_chain
+
+    def _filter_graph_args(self, graph: str) -> list[str]:
+        """-filter_complex, or -filter_complex_script via a temp file for oversized graphs."""
+        if len(graph) > self._MAX_INLINE_FILTER:
+            with tempfile.NamedTemporaryFile(
+                "w", suffix=".ffscript", delete=False, encoding="utf-8"
+            ) as f:
+                f.write(graph)
+            self._tmp_files.append(f.name)
+            return ["-filter_complex_script", f.name]
+        return ["-filter_complex", graph]
+
+    def _output_args(self, hw: str | None, video_label: str, audio_input_index: int | None) -> list[str]:
+        """Stream mapping, codecs and path for this builder's output file."""
         # Map
-        cmd.extend(["-map", current_video_label])
+        args = ["-map", video_label]
         if audio_input_index is not None:
-            cmd.extend(["-map", f"{audio_input_index}:a"])
+            args.extend(["-map", f"{audio_input_index}:a"])
 
         # Codecs
-        cmd.extend(["-c:v", "libx264", "-preset", "ultrafast", "-crf", "23", "-pix_fmt", "yuv420p"])
+        if hw:
+            args.extend(self._HW_ENCODERS[hw][1])
+        else:
+            args.extend(self._VIDEO_CODEC)
+        args.extend(["-threads", str(self.threads)])
         if self.audio_file:
-            cmd.extend(["-c:a", "aac", "-b:a", "192k"])
+            args.extend(self._AUDIO_CODEC)
 
         # Duration
-        cmd.append("-shortest")
+        args.append("-shortest")
 
         # Output
-        cmd.append(self.output_path)
+        args.append(self.output_path)
+        return args
+
+    def build_command(self, audio_duration: float | None = None):
+        """Build the complete FFmpeg command.
+
+        Args:
+            audio_duration: Already-probed audio duration; probed here when omitted
+        """
+        self._validate()
+        audio_duration = self._resolve_audio_duration(audio_duration)
+
+        # Ensure output directory exists
+        self._ensure_outdir()
+
+        hw = self._resolve_hwaccel()
+        cmd = self._global_args(hw)
+        inputs, bg_chain = self._inputs_and_chain(audio_duration, hw)
+        cmd.extend(inputs)
+        cmd.extend(self._filter_graph_args(f"{bg_chain}{self._L_OUT}"))
+        cmd.extend(self._output_args(hw, self._L_OUT, 1 if self.audio_file else None))
         return cmd
 
+    @classmethod
+    def batch_command(cls, builders: list["VideoBuilder"]) -> list[str]:
+        """Build one ffmpeg command that renders every builder's output in a single process.
+
+        Global settings (ffmpeg path, report, threads, hwaccel) come from the first builder.
+        Each builder adds its own inputs, a chain labelled [o<i>] and an output file.
+        """
+        if not builders:
+            raise ValueError("At least one builder is required.")
+        first = builders[0]
+        hw = first._resolve_hwaccel()
+        cmd = first._global_args(hw)
+
+        chains, outputs = [], []
+        input_index = 0
+        for i, b in enumerate(builders):
+            b._validate()
+            audio_duration = b._resolve_audio_duration(None)
+            b._ensure_outdir()
+
+            inputs, bg_chain = b._inputs_and_chain(audio_duration, hw)
+            cmd.extend(inputs)
+            label = f"[o{i}]"
+            # Several chains share the graph, so pin each one to its own background input
+            chains.append(f"[{input_index}:v]{bg_chain}{label}")
+            outputs.extend(b._output_args(hw, label, input_index + 1 if b.audio_file else None))
+            input_index += 2 if b.audio_file else 1
+
+        cmd.extend(first._filter_graph_args(";".join(chains)))
+        cmd.extend(outputs)
+        return cmd
+
+    @classmethod
+    def batch_execute(cls, builders: list["VideoBuilder"]) -> bool:
+        """Render several configured builders with one ffmpeg process instead of one each."""
+        from loguru import logger
+
+        if not builders:
+            return True
+        first = builders[0]
+        if not first.media_utils:
+            logger.error("MediaUtils must be set before executing video build")
+            return False
+
+        start = time.time()
+        context_logger = logger.bind(
+            outputs=[b.output_path for b in builders],
+            youtube_channel="https://www.youtube.com/@aiagentsaz",
+        )
+        try:
+            # Outputs encode side by side, so progress follows the longest one
+            durations = [d for d in (b._expected_duration() for b in builders) if d]
+            expected_duration = max(durations) if durations else None
+
+            cmd = cls.batch_command(builders)
+            context_logger.bind(expected_duration=expected_duration).opt(lazy=True).debug(
+                "executing batch video build command", command=lambda: " ".join(cmd)
+            )
+
+            success = first.media_utils.execute_ffmpeg_command(
+                cmd,
+                f"build {len(builders)} videos",
+                expected_duration=expected_duration,
+                show_progress=True,
+            )
+            if success:
+                context_logger.bind(execution_time=time.time() - start).info("batch videos built successfully")
+            else:
+                context_logger.error("failed to build batch videos")
+            return bool(success)
+
+        except Exception as e:
+            context_logger.bind(error=str(e), execution_time=time.time() - start).error(
+                "error during batch video rendering"
+            )
+            return False
+        finally:
+            while first._tmp_files:
+                try:
+                    os.unlink(first._tmp_files.pop())
+                except OSError:
+                    pass
+
+    @classmethod
+    def batch_render(cls, builders: list["VideoBuilder"], max_workers: int | None = None) -> list[bool]:
+        """Run independent builders' execute() in parallel worker processes.
+
+        Builders left at threads=0 get cpu_count // max_workers threads each so the
+        concurrent encodes share the cores instead of oversubscribing them.
+
+        Returns:
+            list[bool]: execute() result per builder, in input order
+        """
+        if not builders:
+            return []
+        cpus = os.cpu_count() or 1
+        max_workers = min(max_workers or max(1, cpus // 2), len(builders))
+        per_worker_threads = max(1, cpus // max_workers)
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            return list(pool.map(
+                _execute_builder, builders, [per_worker_threads] * len(builders)
+            ))
+
     def execute(self):
         """Build and execute the FFmpeg command using MediaUtils for progress tracking."""
+        from loguru import logger
+
         if not self.media_utils:
             logger.error("MediaUtils must be set before executing video build")
             return False
 
         # Ensure output directory exists
         try:
-            out_dir = os.path.dirname(os.path.abspath(self.output_path)) or "."
-            os.makedirs(out_dir, exist_ok=True)
+            self._ensure_outdir()
         except Exception as e:
             logger.bind(error=str(e)).error("failed to create output directory")
             return False
@@ -333,21 +614,16 @@ class VideoBuilder:
 
         try:
             context_logger.debug("building video with VideoBuilder")
-            cmd = self.build_command()
-
-            # Expected duration (for progress)
-            expected_duration = None
-            if self.audio_file:
-                audio_info = self.media_utils.get_audio_info(self.audio_file)
-                expected_duration = audio_info.get("duration")
-            elif self.background and self.background.get("type") == "video":
-                video_info = self.media_utils.get_video_info(self.background["file"])
-                expected_duration = video_info.get("duration")
-
-            context_logger.bind(
-                command=" ".join(cmd),
-                expected_duration=expected_duration,
-            ).debug("executing video build command")
+
+            # Expected duration (for progress); the audio probe is shared with build_command
+            expected_duration = self._expected_duration()
+
+            cmd = self.build_command(audio_duration=expected_duration if self.audio_file else None)
+
+            # lazy: the joined command is only built when a sink accepts DEBUG
+            context_logger.bind(expected_duration=expected_duration).opt(lazy=True).debug(
+                "executing video build command", command=lambda: " ".join(cmd)
+            )
 
             success = self.media_utils.execute_ffmpeg_command(
                 cmd,
@@ -368,3 +644,9 @@ class VideoBuilder:
                 "error during video rendering"
             )
             return False
+        finally:
+            while self._tmp_files:
+                try:
+                    os.unlink(self._tmp_files.pop())
+                except OSError:
+                    pass
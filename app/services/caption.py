@@ -1,9 +1,124 @@
+import bisect
+import functools
+import itertools
 import re
 import string
 import unicodedata
 from typing import List, Dict, Tuple
 from loguru import logger
 
+# Full-width / CJK punctuation accepted on top of ASCII punctuation and Unicode P* categories
+_EXTRA_CJK = frozenset("，。、！？；：【】《》（）——…“”‘’、～·「」『』〔〕￥＄％＠＃＊—－‥︰︱︳︴︵︶︷︸︹︺︻︼︽︾︿﹀﹁﹂﹃﹄")
+# string.punctuation is a str, so `in` on it is a linear scan; keep a set instead
+_ASCII_PUNCT_SET = frozenset(string.punctuation)
+_PUNCT_SET = _ASCII_PUNCT_SET | _EXTRA_CJK
+# Deletes every known punctuation char in one C-level pass
+_PUNCT_TRANS = str.maketrans("", "", "".join(_PUNCT_SET))
+# Scripts written without spaces (CJK ideographs, hiragana/katakana): split by character
+_CJK_RE = re.compile(r"[\u4e00-\u9fff\u3040-\u30ff]")
+# WebVTT timestamp: "HH:MM:SS.mmm" or "MM:SS.mmm"
+_TS_RE = re.compile(r"(?:(\d{1,2}):)?(\d{2}):(\d{2}\.\d{1,3})$")
+# WebVTT cue: timing line ("start --> end [settings]") followed by non-blank text lines
+_CUE_RE = re.compile(
+    r"^[ \t]*(\S+)[ \t]*-->[ \t]*(\S+)[^\n]*(?:\n|$)((?:[ \t]*\S[^\n]*(?:\n|$))*)",
+    re.MULTILINE,
+)
+# Latin-1 lookup table: byte i is 1 iff chr(i) counts as punctuation (same rule as below)
+_ASCII_PUNCT = bytes(
+    1 if chr(i) in _PUNCT_SET or (not chr(i).isspace() and unicodedata.category(chr(i)).startswith("P")) else 0
+    for i in range(256)
+)
+
+
+@functools.lru_cache(maxsize=4096)
+def _is_punct_codepoint(o: int) -> bool:
+    ch = chr(o)
+    return not ch.isspace() and unicodedata.category(ch).startswith("P")
+
+
+# Script header + default style of every generated .ass file
+_ASS_HEADER = """[Script Info]
+ScriptType: v4.00+
+PlayResX: {width}
+PlayResY: {height}
+
+[V4+ Styles]
+Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, BackColour, Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, BorderStyle, Outline, Shadow, Alignment, MarginL, MarginR, MarginV, Encoding
+Style: Default,{font_name},{font_size},{font_color},&H000000FF,{stroke_color},&H00000000,{bold},{italic},0,0,100,100,0,0,1,{stroke_size},0,8,20,20,20,1
+
+[Events]
+Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
+"""
+
+# Color conversions are cached: a job uses a handful of colors but converts them per segment
+@functools.lru_cache(maxsize=256)
+def _hex_to_ass(hex_color: str, alpha: float = 0.0) -> str:
+    hex_color = hex_color.lstrip("#")
+    if len(hex_color) == 3:
+        hex_color = "".join([c * 2 for c in hex_color])
+    if len(hex_color) != 6:
+        raise ValueError("hex_color must be 'RRGGBB' or 'RGB'")
+
+    r = int(hex_color[0:2], 16)
+    g = int(hex_color[2:4], 16)
+    b = int(hex_color[4:6], 16)
+
+    # ASS alpha: 00=opaque, FF=transparent (we map alpha directly)
+    a = int(round(max(0.0, min(1.0, alpha)) * 255))
+
+    aa = f"{a:02X}"
+    bb = f"{b:02X}"
+    gg = f"{g:02X}"
+    rr = f"{r:02X}"
+    return f"&H{aa}{bb}{gg}{rr}"
+
+
+@functools.lru_cache(maxsize=256)
+def _hex_to_ass_no_alpha(hex_color: str) -> str:
+    hex_color = hex_color.lstrip("#")
+    if len(hex_color) == 3:
+        hex_color = "".join([c * 2 for c in hex_color])
+    if len(hex_color) != 6:
+        raise ValueError("hex_color must be 'RRGGBB' or 'RGB'")
+    r = int(hex_color[0:2], 16)
+    g = int(hex_color[2:4], 16)
+    b = int(hex_color[4:6], 16)
+    return f"&H{b:02X}{g:02X}{r:02X}&"
+
+
+def _has_cjk(text: str) -> bool:
+    # isascii() reads the string's cached ASCII flag, so English text is rejected without a scan
+    return not text.isascii() and _CJK_RE.search(text) is not None
+
+
+def _fix_overlaps(segments: List[Dict], gap: float = 0.05) -> None:
+    """End each segment `gap` seconds before the next one starts if they overlap (in place)."""
+    # Only end_ts is written and only start_ts is read, so one pairwise pass is enough
+    for cur, nxt in zip(segments, segments[1:]):
+        next_start = nxt["start_ts"]
+        if cur["end_ts"] >= next_start:
+            cur["end_ts"] = next_start - gap
+
+
+def _wrap_words(words: List[str], max_length: int) -> List[str]:
+    """
+    Greedily pack space-separated words into lines of at most max_length chars
+    (a single longer word gets its own line).
+
+    Cut points come from bisecting the running width sum, so the Python loop runs
+    once per output line rather than once per word.
+    """
+    # cum[k] = width of words[0..k], each counted with one separating space
+    cum = list(itertools.accumulate(len(w) + 1 for w in words))
+    parts = []
+    i, base = 0, 0
+    while i < len(words):
+        # Largest j with len(" ".join(words[i:j])) = cum[j-1] - base - 1 <= max_length
+        j = max(bisect.bisect_right(cum, base + max_length + 1, lo=i), i + 1)
+        parts.append(" ".join(words[i:j]))
+        i, base = j, cum[j - 1]
+    return parts
+
 
 class Caption:
     # --- NEW: broader punctuation detection (ASCII + CJK + Unicode P* categories)
@@ -15,15 +130,23 @@ class Caption:
         """
         if not text:
             return False
-
-        extra_cjk = set("，。、！？；：【】《》（）——…“”‘’、～·「」『』〔〕￥＄％＠＃＊—－‥︰︱︳︴︵︶︷︸︹︺︻︼︽︾︿﹀﹁﹂﹃﹄")
-        for ch in text:
-            if ch.isspace():
-                return False  # token-level: we don't expect spaces inside punctuation tokens
-            cat = unicodedata.category(ch)
-            if cat.startswith("P") or ch in string.punctuation or ch in extra_cjk:
-                continue
-            return False
+        if text.isascii():
+            # Common case (English tokens): strip() removes set members in C; anything left
+            # (letters, digits, spaces) means it's not punctuation
+            return not text.strip(string.punctuation)
+
+        # Strip the known set; only leftovers need a Unicode category lookup
+        rest = text.translate(_PUNCT_TRANS)
+        if not rest:
+            return True
+        # Spaces are never punctuation: we don't expect them inside punctuation tokens
+        for ch in rest:
+            o = ord(ch)
+            if o < 256:
+                if not _ASCII_PUNCT[o]:
+                    return False
+            elif not _is_punct_codepoint(o):
+                return False
         return True
 
     
@@ -39,7 +162,8 @@ class Caption:
             return []
 
         segments = []
-        current_segment_texts = ["" for _ in range(lines)]
+        current_segment_texts = [""] * lines
+        cur_lens = [0] * lines  # len() of each current_segment_texts entry
         current_line = 0
         segment_start_ts = captions[0]["start_ts"]
         segment_end_ts = captions[0]["end_ts"]
@@ -56,12 +180,13 @@ class Caption:
             if self.is_punctuation(text):
                 if current_line < lines and current_segment_texts[current_line]:
                     current_segment_texts[current_line] += text
+                    cur_lens[current_line] += len(text)
                 continue
 
             # If the line is too long, move to the next one
             if (
                 current_line < lines
-                and len(current_segment_texts[current_line] + text) > max_length
+                and cur_lens[current_line] + len(text) > max_length
             ):
                 current_line += 1
 
@@ -75,18 +200,21 @@ class Caption:
                     }
                 )
 
-                # Reset for next segment
-                current_segment_texts = ["" for _ in range(lines)]
+                # Reset for next segment (a new list: the old one now belongs to `segments`)
+                current_segment_texts = [""] * lines
+                cur_lens = [0] * lines
                 current_line = 0
                 # Add a small gap (0.05s) between segments to prevent overlap
                 segment_start_ts = start_ts + 0.05
 
             # Add the text to the current segment
             if current_line < lines:
-                current_segment_texts[current_line] += (
-                    " " if current_segment_texts[current_line] else ""
-                )
-                current_segment_texts[current_line] += text
+                if current_segment_texts[current_line]:
+                    current_segment_texts[current_line] += " " + text
+                    cur_lens[current_line] += 1 + len(text)
+                else:
+                    current_segment_texts[current_line] = text
+                    cur_lens[current_line] = len(text)
 
         # Add the last segment if there's any content
         if any(current_segment_texts):
@@ -99,9 +227,7 @@ class Caption:
             )
 
         # Post-processing to ensure no overlaps by adjusting end times if needed
-        for i in range(len(segments) - 1):
-            if segments[i]["end_ts"] >= segments[i + 1]["start_ts"]:
-                segments[i]["end_ts"] = segments[i + 1]["start_ts"] - 0.05
+        _fix_overlaps(segments)
 
         return segments
 
@@ -135,41 +261,24 @@ class Caption:
 
             # Check if text is using Chinese/Japanese/Korean characters (CJK)
             # For CJK, we'll split by characters rather than words
-            is_cjk = any("\u4e00" <= char <= "\u9fff" for char in text)
+            is_cjk = _has_cjk(text)
 
             parts = []
             if is_cjk:
-                # For CJK languages, process character by character
-                current_part = ""
-                for char in text:
-                    if len(current_part + char) > max_length:
-                        parts.append(current_part)
-                        current_part = char
-                    else:
-                        current_part += char
-
-                # Add the last part if not empty
-                if current_part:
-                    parts.append(current_part)
+                # For CJK languages every character is one unit wide, so the cut
+                # points are simply every max_length characters
+                parts = [text[i : i + max_length] for i in range(0, len(text), max_length)]
             else:
                 # Original word-based splitting for languages with spaces
-                words = text.split()
-                current_part = ""
-
-                for word in words:
-                    # If adding this word would exceed max_length, start a new part
-                    if len(current_part + " " + word) > max_length and current_part:
-                        parts.append(current_part.strip())
-                        current_part = word
+                words = []
+                for word in text.split():
+                    # Stand-alone punctuation ("Bonjour !", "wait …") stays with the word
+                    # before it, so a line never starts with an orphaned mark
+                    if words and self.is_punctuation(word):
+                        words[-1] = f"{words[-1]} {word}"
                     else:
-                        # Add space if not the first word in the part
-                        if current_part:
-                            current_part += " "
-                        current_part += word
-
-                # Add the last part if not empty
-                if current_part:
-                    parts.append(current_part.strip())
+                        words.append(word)
+                parts = _wrap_words(words, max_length)
 
             # Group parts into segments with 'lines' number of lines per segment
             segment_parts = []
@@ -211,9 +320,7 @@ class Caption:
                 )
 
         # Ensure no overlaps between segments by adjusting end times if needed
-        for i in range(len(segments) - 1):
-            if segments[i]["end_ts"] >= segments[i + 1]["start_ts"]:
-                segments[i]["end_ts"] = segments[i + 1]["start_ts"] - 0.05
+        _fix_overlaps(segments)
 
         return segments
 
@@ -228,37 +335,12 @@ class Caption:
         :param alpha: transparency from 0.0 (opaque) to 1.0 (fully transparent)
         :return: "&HaaBBGGRR&"
         """
-        hex_color = hex_color.lstrip("#")
-        if len(hex_color) == 3:
-            hex_color = "".join([c * 2 for c in hex_color])
-        if len(hex_color) != 6:
-            raise ValueError("hex_color must be 'RRGGBB' or 'RGB'")
-
-        r = int(hex_color[0:2], 16)
-        g = int(hex_color[2:4], 16)
-        b = int(hex_color[4:6], 16)
-
-        # ASS alpha: 00=opaque, FF=transparent (we map alpha directly)
-        a = int(round(max(0.0, min(1.0, alpha)) * 255))
-
-        aa = f"{a:02X}"
-        bb = f"{b:02X}"
-        gg = f"{g:02X}"
-        rr = f"{r:02X}"
-        return f"&H{aa}{bb}{gg}{rr}"
+        return _hex_to_ass(hex_color, alpha)
 
     # --- NEW: helper that returns &HBBGGRR& (no alpha) for override tags like \1c
     @staticmethod
     def hex_to_ass_no_alpha(hex_color: str) -> str:
-        hex_color = hex_color.lstrip("#")
-        if len(hex_color) == 3:
-            hex_color = "".join([c * 2 for c in hex_color])
-        if len(hex_color) != 6:
-            raise ValueError("hex_color must be 'RRGGBB' or 'RGB'")
-        r = int(hex_color[0:2], 16)
-        g = int(hex_color[2:4], 16)
-        b = int(hex_color[4:6], 16)
-        return f"&H{b:02X}{g:02X}{r:02X}&"
+        return _hex_to_ass_no_alpha(hex_color)
 
     def create_subtitle(
         self,
@@ -288,87 +370,85 @@ class Caption:
         if subtitle_position == "bottom":
             position_from_top = 0.75
 
-        ass_content = """[Script Info]
-ScriptType: v4.00+
-PlayResX: {width}
-PlayResY: {height}
-
-[V4+ Styles]
-Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, BackColour, Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, BorderStyle, Outline, Shadow, Alignment, MarginL, MarginR, MarginV, Encoding
-Style: Default,{font_name},{font_size},{font_color},&H000000FF,{stroke_color},&H00000000,{bold},{italic},0,0,100,100,0,0,1,{stroke_size},0,8,20,20,20,1
-
-[Events]
-Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
-""".format(
-            width=width,
-            height=height,
-            font_size=font_size,
+        header = _ASS_HEADER.format_map({
+            "width": width,
+            "height": height,
+            "font_size": font_size,
             # Style colors: &HaaBBGGRR& is valid here, so include alpha if desired (we use opaque)
-            font_color=self.hex_to_ass(font_color, alpha=0.0),
-            stroke_color=self.hex_to_ass(stroke_color, alpha=0.0),
-            stroke_size=stroke_size,
-            font_name=font_name,
-            bold=bold_value,
-            italic=italic_value,
-        )
+            "font_color": self.hex_to_ass(font_color, alpha=0.0),
+            "stroke_color": self.hex_to_ass(stroke_color, alpha=0.0),
+            "stroke_size": stroke_size,
+            "font_name": font_name,
+            "bold": bold_value,
+            "italic": italic_value,
+        })
 
         pos_x = int(width / 2)
         pos_y = int(height * position_from_top)
 
-        for segment in segments:
-            start_time = self.format_time(segment["start_ts"])
-            end_time = self.format_time(segment["end_ts"])
-
-            text_lines = segment["text"]
-            formatted_text = ""
-            for i, line in enumerate(text_lines):
-                if line:
-                    if i > 0:
-                        formatted_text += "\\N"
-                    formatted_text += line
-
-            # --- Build override tags shared by shadow/main
-            fad_tag = f"\\fad({fade_ms},{fade_ms})" if fade_ms and fade_ms > 0 else ""
-            main_override_tags = f"\\pos({pos_x},{pos_y}){fad_tag}"
-
-            # --- SHADOW: use \1c with NO alpha (&HBBGGRR&) and \1a for transparency
-            if shadow_blur > 0 or shadow_transparency > 0.0:
-                shadow_pos_x = pos_x + 2
-                shadow_pos_y = pos_y + 2
-                shadow_color_no_a = self.hex_to_ass_no_alpha(shadow_color)
-                # ASS alpha is 00 opaque..FF transparent; shadow_transparency maps directly
-                alpha_byte = int(round(max(0.0, min(1.0, shadow_transparency)) * 255))
-                alpha_hex = f"{alpha_byte:02X}"
-
-                shadow_override_tags = (
-                    f"\\pos({shadow_pos_x},{shadow_pos_y}){fad_tag}"
-                    f"\\1c{shadow_color_no_a}\\1a&H{alpha_hex}&\\bord0"
-                )
-                if shadow_blur > 0:
-                    shadow_override_tags += f"\\blur{shadow_blur}"
+        # --- Override tags depend only on the arguments; build them once for all segments
+        fad_tag = f"\\fad({fade_ms},{fade_ms})" if fade_ms and fade_ms > 0 else ""
+        main_prefix = f"{{\\pos({pos_x},{pos_y}){fad_tag}}}"
+
+        # --- SHADOW: use \1c with NO alpha (&HBBGGRR&) and \1a for transparency
+        draw_shadow = shadow_blur > 0 or shadow_transparency > 0.0
+        if draw_shadow:
+            shadow_pos_x = pos_x + 2
+            shadow_pos_y = pos_y + 2
+            shadow_color_no_a = self.hex_to_ass_no_alpha(shadow_color)
+            # ASS alpha is 00 opaque..FF transparent; shadow_transparency maps directly
+            alpha_byte = int(round(max(0.0, min(1.0, shadow_transparency)) * 255))
+            alpha_hex = f"{alpha_byte:02X}"
+
+            shadow_override_tags = (
+                f"\\pos({shadow_pos_x},{shadow_pos_y}){fad_tag}"
+                f"\\1c{shadow_color_no_a}\\1a&H{alpha_hex}&\\bord0"
+            )
+            if shadow_blur > 0:
+                shadow_override_tags += f"\\blur{shadow_blur}"
+            shadow_prefix = f"{{{shadow_override_tags}}}"
+
+        # --- Dialogue line(s) per segment: shadow first (if any), then MAIN text (no color
+        # override here; style carries color). Filled with one %-format per segment.
+        prefixes = [shadow_prefix, main_prefix] if draw_shadow else [main_prefix]
+        dialogue_tmpl = "".join(
+            "Dialogue: 0,%(s)s,%(e)s,Default,,0,0,0,," + prefix.replace("%", "%%") + "%(t)s\n"
+            for prefix in prefixes
+        )
 
-                shadow_text = f"{{{shadow_override_tags}}}" + formatted_text
-                ass_content += f"Dialogue: 0,{start_time},{end_time},Default,,0,0,0,,{shadow_text}\n"
+        # Stream lines straight into a large write buffer instead of assembling the whole
+        # document in memory first
+        with open(output_path, "w", encoding="utf-8", buffering=1 << 20) as f:
+            f.write(header)
+            for segment in segments:
+                start_time = self.format_time(segment["start_ts"])
+                end_time = self.format_time(segment["end_ts"])
 
-            # --- MAIN text (no color override here; style carries color)
-            main_text = f"{{{main_override_tags}}}" + formatted_text
-            ass_content += f"Dialogue: 0,{start_time},{end_time},Default,,0,0,0,,{main_text}\n"
+                text_lines = segment["text"]
+                formatted_text = ""
+                for i, line in enumerate(text_lines):
+                    if line:
+                        if i > 0:
+                            formatted_text += "\\N"
+                        formatted_text += line
 
-        with open(output_path, "w", encoding="utf-8") as f:
-            f.write(ass_content)
+                f.write(dialogue_tmpl % {"s": start_time, "e": end_time, "t": formatted_text})
 
         logger.debug("subtitle (ass) was created with drop shadow and overrides")
 
     def format_time(self, seconds: float) -> str:
-        hours = int(seconds // 3600)
-        minutes = int((seconds % 3600) // 60)
-        secs = int(seconds % 60)
-        centisecs = int(round((seconds % 1) * 100))
+        # Round once to whole centiseconds, then split with integer divmod (H:MM:SS.cc)
+        cs_total = int(seconds * 100 + 0.5)
+        hours, rem = divmod(cs_total, 360000)
+        minutes, rem = divmod(rem, 6000)
+        secs, centisecs = divmod(rem, 100)
         return f"{hours}:{minutes:02d}:{secs:02d}.{centisecs:02d}"
 
+@functools.lru_cache(maxsize=4096)
 def _parse_vtt_timestamp(ts: str) -> float:
     # Supports "HH:MM:SS.mmm" or "MM:SS.mmm"
-    m = re.match(r"(?:(\d{1,2}):)?(\d{2}):(\d{2}\.\d{1,3})$", ts.strip())
+    # Cached: a cue's end timestamp is usually the next cue's start
+    m = _TS_RE.match(ts.strip())
     if not m:
         raise ValueError(f"Invalid VTT timestamp: {ts}")
     h = int(m.group(1) or 0)
@@ -385,36 +465,16 @@ def parse_webvtt_to_captions(vtt_text: str) -> List[Dict]:
     - Combines multi-line block text into a single string separated by spaces.
     - Ignores cue numbers, blank lines, 'WEBVTT' header.
     """
-    lines = [ln.rstrip("\n") for ln in vtt_text.splitlines()]
+    text = vtt_text.replace("\r\n", "\n").replace("\r", "\n")
     captions: List[Dict] = []
-    i = 0
-    while i < len(lines):
-        ln = lines[i].strip()
-        i += 1
-        if not ln or ln.upper().startswith("WEBVTT"):
-            continue
-        # Optional numeric cue id
-        if ln.isdigit():
-            if i >= len(lines):
-                break
-            ln = lines[i].strip()
-            i += 1
-        # Expect timing line
-        if "-->" in ln:
-            start_s, end_s = [x.strip() for x in ln.split("-->")[:2]]
-            start_ts = _parse_vtt_timestamp(start_s.replace(",", "."))
-            end_ts = _parse_vtt_timestamp(end_s.split()[0].replace(",", "."))
-            # Collect text lines until blank
-            buff = []
-            while i < len(lines) and lines[i].strip():
-                buff.append(lines[i].strip())
-                i += 1
-            text = " ".join(buff).strip()
-            if text:
-                captions.append({"text": text, "start_ts": start_ts, "end_ts": end_ts})
-        # Skip until next blank
-        while i < len(lines) and lines[i].strip():
-            i += 1
+    # One regex pass finds every timing line plus the non-blank lines under it; anything
+    # outside a match (header, cue ids, NOTE blocks) is skipped without per-line bookkeeping
+    for m in _CUE_RE.finditer(text):
+        start_ts = _parse_vtt_timestamp(m.group(1).replace(",", "."))
+        end_ts = _parse_vtt_timestamp(m.group(2).replace(",", "."))
+        cue_text = " ".join(ln.strip() for ln in m.group(3).splitlines()).strip()
+        if cue_text:
+            captions.append({"text": cue_text, "start_ts": start_ts, "end_ts": end_ts})
     return captions
 
 
@@ -446,7 +506,7 @@ def convert_webvtt_to_ass(
     # Heuristic language choice
     if language_hint == "auto":
         sample = "".join(c["text"] for c in captions[:3])
-        is_cjk = any("\u4e00" <= ch <= "\u9fff" or "\u3040" <= ch <= "\u30ff" for ch in sample)
+        is_cjk = _has_cjk(sample)
         lang = "cjk" if is_cjk else "en"
     else:
         lang = language_hint
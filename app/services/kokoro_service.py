@@ -0,0 +1,32 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, List, Tuple
+
+from app.services.tts_kokoro import TTS
+
+class KokoroService:
+    """
+    Async wrapper around the blocking Kokoro TTS calls.
+
+    All synthesis runs on one dedicated worker thread, so requests queue in
+    arrival order, the model (and any CUDA context) stays pinned to that
+    thread, and the event loop is never blocked by a forward pass.
+    """
+    def __init__(self, engine: TTS | None = None):
+        self.engine = engine or TTS()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="kokoro")
+
+    async def synthesize(
+        self, text: str, wav_path: str, voice: str, lang_code: str, speed: float = 1.0
+    ) -> Tuple[List[dict], Any]:
+        # TTS.kokoro picks kokoro_english (per-token timestamps) or kokoro_international
+        # (per-sentence timestamps) from the voice, and serves repeated requests from its cache
+        fn = partial(self.engine.kokoro, text, wav_path, voice=voice, speed=speed)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, fn)
+
+    def close(self) -> None:
+        # Drop queued jobs; a synthesis already running finishes on its own thread
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self.engine.close()
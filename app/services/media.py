@@ -288,7 +288,8 @@ class MediaUtils:
             video_stream = streams[0]
 
             video_info = {
-                "duration": float(format_info.get("duration", 0)),
+                # Container duration first; fall back to the stream's own duration
+                "duration": float(format_info.get("duration") or video_stream.get("duration") or 0),
                 "width": video_stream.get("width"),
                 "height": video_stream.get("height"),
                 "fps": video_stream.get("avg_frame_rate", "0/1").split("/")[0],
@@ -347,7 +348,8 @@ class MediaUtils:
             audio_stream = streams[0]
 
             audio_info = {
-                "duration": float(format_info.get("duration", 0)),
+                # Container duration first; fall back to the stream's own duration
+                "duration": float(format_info.get("duration") or audio_stream.get("duration") or 0),
                 "channels": audio_stream.get("channels", 0),
                 "sample_rate": audio_stream.get("sample_rate", "0"),
                 "codec": audio_stream.get("codec_name", ""),
@@ -513,6 +515,7 @@ class MediaUtils:
         operation_name: str,
         expected_duration: float = None,
         show_progress: bool = True,
+        bufsize: int = 1 << 20,
     ) -> bool:
         """
         Execute an ffmpeg command with proper logging and progress tracking.
@@ -522,13 +525,14 @@ class MediaUtils:
             operation_name: Name of the operation for logging
             expected_duration: Expected duration for progress calculation
             show_progress: Whether to show progress information
+            bufsize: stderr pipe buffer size; large enough that verbose logging never stalls ffmpeg
 
         Returns:
             bool: True if successful, False otherwise
         """
         try:
-            logger.bind(command=" ".join(cmd), operation=operation_name).debug(
-                f"executing ffmpeg command for {operation_name}"
+            logger.bind(operation=operation_name).opt(lazy=True).debug(
+                f"executing ffmpeg command for {operation_name}", command=lambda: " ".join(cmd)
             )
 
             process = subprocess.Popen(
@@ -536,6 +540,7 @@ class MediaUtils:
                 stderr=subprocess.PIPE,
                 universal_newlines=True,
                 text=True,
+                bufsize=bufsize,
             )
 
             # Process the output line by line as it becomes available
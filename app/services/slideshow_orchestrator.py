@@ -1,37 +1,88 @@
+import math
 import os
 import subprocess
 import shutil
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 from datetime import datetime
 from typing import List, Optional
 
 from loguru import logger
 
+from app.services.builder import _ZOOM_TEMPLATES, _ffmpeg_encoders
 from app.services.media import MediaUtils
 
 
+def _run_segment_worker(ffmpeg_path: str, cmd: List[str], description: str) -> bool:
+    """Process-pool entry point: run one prebuilt ffmpeg command (module-level so it pickles)."""
+    return MediaUtils(ffmpeg_path=ffmpeg_path).execute_ffmpeg_command(cmd, description)
+
+
 class MultiImageVideoBuilder:
     """
-    Render per-image VIDEO-ONLY segments (no audio), concatenate them,
-    then add the single audio track and burn captions at the final step.
+    Render a list of images as one video: each image gets its own effect chain, the
+    `concat` filter joins them, and the single audio track and burned captions are
+    added in the same ffmpeg pass.
     """
 
+    # Narration is mono speech: one channel at 96k matches 192k stereo for half the work
+    _AUDIO_CODEC = ("-c:a", "aac", "-b:a", "96k", "-ac", "1")
+    _SW_VIDEO_CODEC = ("-c:v", "libx264", "-preset", "ultrafast", "-crf", "23", "-pix_fmt", "yuv420p")
+    # hwaccel name -> (ffmpeg encoder, video codec args); "auto" tries them in this order.
+    # yuv420p is kept for NVENC/VideoToolbox: PNG/RGB sources would otherwise encode as 4:4:4.
+    _HW_ENCODERS = {
+        "nvenc": ("h264_nvenc", ("-c:v", "h264_nvenc", "-preset", "p4", "-tune", "ll",
+                                 "-rc", "vbr", "-cq", "23", "-pix_fmt", "yuv420p")),
+        "vaapi": ("h264_vaapi", ("-c:v", "h264_vaapi", "-qp", "23")),
+        "videotoolbox": ("h264_videotoolbox", ("-c:v", "h264_videotoolbox", "-b:v", "8M", "-pix_fmt", "yuv420p")),
+    }
+    _VAAPI_DEVICE = "/dev/dri/renderD128"
+    # zoompan expressions per Ken Burns direction, the same ones VideoBuilder uses
+    _ZOOM_TEMPLATES = _ZOOM_TEMPLATES
+    # Consumer GPUs cap concurrent encode sessions; more parallel renders just fail to open
+    _MAX_HW_WORKERS = 2
+    # Images per ffmpeg graph; longer slideshows render in groups that are concatenated
+    _MAX_GRAPH_INPUTS = 16
+    # Audio durations by (abspath, size, mtime); repeat builds skip the ffprobe spawn
+    _DURATION_CACHE: dict[tuple[str, int, float], float] = {}
+    _DURATION_CACHE_MAX = 64
+
     def __init__(
         self,
         dimensions: tuple[int, int],
         ffmpeg_path: str = "ffmpeg",
         fps: int = 25,
         workdir: Optional[str] = None,
+        hwaccel: Optional[str] = None,
     ):
         self.width, self.height = dimensions
         self.ffmpeg_path = ffmpeg_path
         self.fps = fps
         self.media = MediaUtils(ffmpeg_path=ffmpeg_path)
         self.workdir = workdir  # created in build() if not provided
+        # Hardware H.264 encoder: "nvenc", "vaapi", "videotoolbox" or "auto"; libx264 if missing
+        self.hwaccel = self._detect_hw_encoder(hwaccel)
+        self._venc_args = list(self._HW_ENCODERS[self.hwaccel][1] if self.hwaccel else self._SW_VIDEO_CODEC)
+        # VAAPI needs a device before the inputs and CPU frames uploaded at the end of the graph
+        self._hw_device_args = ["-vaapi_device", self._VAAPI_DEVICE] if self.hwaccel == "vaapi" else []
+        self._hw_upload = ",format=nv12,hwupload" if self.hwaccel == "vaapi" else ""
 
     # ---------------------------
     # Utilities
     # ---------------------------
 
+    def _detect_hw_encoder(self, hwaccel: Optional[str]) -> Optional[str]:
+        """Pick the requested hardware encoder if this ffmpeg build has it (probed once per binary)."""
+        if not hwaccel:
+            return None
+        candidates = list(self._HW_ENCODERS) if hwaccel == "auto" else [hwaccel]
+        available = _ffmpeg_encoders(self.ffmpeg_path)
+        for name in candidates:
+            enc = self._HW_ENCODERS.get(name)
+            if enc and enc[0] in available:
+                return name
+        logger.bind(hwaccel=hwaccel).warning("hardware encoder not available, using libx264")
+        return None
+
     def _make_workdir(self, base_dir: Optional[str]) -> str:
         if base_dir:
             os.makedirs(base_dir, exist_ok=True)
@@ -51,12 +102,43 @@ class MultiImageVideoBuilder:
             logger.error(f"ffmpeg failed ({description}): {e}")
             return False
 
+    def _encode_head(self, threads: int = 0) -> List[str]:
+        """
+        ffmpeg binary and the options that precede the inputs of a re-encoding command.
+        Filter threads default to every core (zoompan/subtitles would otherwise run
+        narrow); pooled renders pass their share of the cores instead.
+        """
+        filter_threads = str(threads or os.cpu_count() or 4)
+        return [
+            self.ffmpeg_path, "-y", *self._hw_device_args,
+            "-filter_complex_threads", filter_threads, "-filter_threads", filter_threads,
+        ]
+
+    def _encode_args(self, threads: int = 0) -> List[str]:
+        """Video codec options; -threads 0 lets the encoder use every core."""
+        return [*self._venc_args, "-threads", str(threads)]
+
     def _get_audio_duration(self, audio_path: str) -> float:
+        """ffprobe the duration once per unchanged file, shared by all builders."""
+        try:
+            st = os.stat(audio_path)
+            key = (os.path.abspath(audio_path), st.st_size, st.st_mtime)
+        except OSError:
+            key = None  # let MediaUtils report the problem; nothing stable to key on
+        cache = MultiImageVideoBuilder._DURATION_CACHE
+        if key in cache:
+            return cache[key]
+
         info = self.media.get_audio_info(audio_path)
         dur = info.get("duration")
         if not dur:
             raise ValueError("Could not read audio duration")
-        return float(dur)
+        dur = float(dur)
+        if key is not None:
+            if len(cache) >= self._DURATION_CACHE_MAX:
+                cache.pop(next(iter(cache)))
+            cache[key] = dur
+        return dur
 
     def _compute_durations(self, n: int, audio_path: str, image_durations: Optional[List[float]]) -> List[float]:
         if image_durations is not None:
@@ -73,76 +155,48 @@ class MultiImageVideoBuilder:
         durations[-1] = max(0.01, total - sum(durations[:-1]))
         return durations
 
-    def _concat_videos(self, segments: List[str], output_path: str) -> bool:
-        """
-        Concatenate segments using ffmpeg concat demuxer. All segments share same
-        codec/params so -c copy should work; fallback to re-encode if needed.
-        """
+    def _write_concat_list(self, segments: List[str]) -> str:
+        """concat-demuxer list of `segments`, so a later ffmpeg reads them as one stream."""
         list_file = os.path.join(self.workdir, "concat_list.txt")
         with open(list_file, "w", encoding="utf-8") as f:
             for p in segments:
                 ap = os.path.abspath(p).replace("\\", "/")
                 f.write(f"file '{ap}'\n")
-
-        # Try stream copy first
-        cmd = [
-            self.ffmpeg_path, "-y",
-            "-f", "concat", "-safe", "0",
-            "-i", list_file,
-            "-c", "copy",
-            output_path,
-        ]
-        ok = self._run_ffmpeg(cmd, "concat segments")
-        if not ok:
-            # Fallback: re-encode
-            cmd = [
-                self.ffmpeg_path, "-y",
-                "-f", "concat", "-safe", "0",
-                "-i", list_file,
-                "-c:v", "libx264", "-preset", "ultrafast", "-crf", "23", "-pix_fmt", "yuv420p",
-                output_path,
-            ]
-            ok = self._run_ffmpeg(cmd, "concat segments (re-encode fallback)")
-        return ok
+        return list_file
 
     # ---------------------------
-    # Segment rendering (VIDEO-ONLY)
+    # Image rendering (VIDEO-ONLY)
     # ---------------------------
 
-    def _render_image_segment_video_only(
-        self,
-        image_path: str,
-        duration: float,
-        effect_config: Optional[dict],
-        out_path: str,
-    ) -> bool:
+    def _segment_chain(self, idx: int, duration: float, effect_config: Optional[dict]) -> str:
         """
-        Render one image to a VIDEO-ONLY segment of `duration` seconds.
-        Bounded by filter-side trim so it cannot run away with -loop 1.
+        Filter chain turning input `idx` (one image) into `duration` seconds of video, [v<idx>].
+        The image is decoded and scaled once; the graph repeats that single frame
+        (zoompan from one input frame, `loop` for pan/plain) exactly as many times as the
+        segment has frames, so nothing is generated only to be trimmed away.
         """
         eff = effect_config or {"effect": "ken_burns"}
         effect_type = eff.get("effect", "ken_burns")
         fps = self.fps
         W, H = self.width, self.height
         duration_frames = max(1, int(round(duration * fps)))
+        # frames with pts < duration (what `trim=duration` used to keep)
+        hold_frames = max(1, math.ceil(round(duration * fps, 6)))
+        # repeat the already-scaled frame instead of decoding/scaling the image per frame
+        hold = f"loop=loop={hold_frames - 1}:size=1:start=0,setpts=N/({fps}*TB)"
     
         if effect_type == "ken_burns":
             zoom_factor = eff.get("zoom_factor", 0.001)
             direction = eff.get("direction", "zoom-to-top-left")
-            zoom_expressions = {
-                "zoom-to-top":      f"z='zoom+{zoom_factor}':x=iw/2-(iw/zoom/2):y=0",
-                "zoom-to-center":   f"z='zoom+{zoom_factor}':x=iw/2-(iw/zoom/2):y=ih/2-(ih/zoom/2)",
-                "zoom-to-top-left": f"z='zoom+{zoom_factor}':x=0:y=0",
-            }
-            zoom_expr = zoom_expressions.get(direction, zoom_expressions["zoom-to-top-left"])
+            zoom_expr = self._ZOOM_TEMPLATES.get(
+                direction, self._ZOOM_TEMPLATES["zoom-to-top-left"]
+            ).format(zf=zoom_factor)
     
-            filter_str = (
-                f"[0]scale={W}:-2,setsar=1:1,"
+            return (
+                f"[{idx}:v]scale={W}:-2,setsar=1:1,"
                 f"crop={W}:{H},"
                 # produce exactly duration_frames at fps
-                f"zoompan={zoom_expr}:d={duration_frames}:s={W}x{H}:fps={fps},"
-                # hard bound the segment length
-                f"trim=duration={duration:.6f},setpts=PTS-STARTPTS[v]"
+                f"zoompan={zoom_expr}:d={duration_frames}:s={W}x{H}:fps={fps}[v{idx}]"
             )
     
         elif effect_type == "pan":
@@ -170,33 +224,130 @@ class MultiImageVideoBuilder:
                 start_x, end_x = 0, scaled_w - W
                 start_y = end_y = (scaled_h - H) // 2
     
-            pan_x_expr = f"{start_x}+({end_x}-{start_x})*t/{duration}*{speed_mult}"
-            pan_y_expr = f"{start_y}+({end_y}-{start_y})*t/{duration}*{speed_mult}"
+            # Per-frame step precomputed here (t = n/fps after the hold), so crop evaluates
+            # one multiply by frame number n instead of the whole trajectory expression
+            step_x = (end_x - start_x) * speed_mult / (duration * fps)
+            step_y = (end_y - start_y) * speed_mult / (duration * fps)
+            pan_x_expr = f"{start_x}+{step_x:.6g}*n"
+            pan_y_expr = f"{start_y}+{step_y:.6g}*n"
     
-            filter_str = (
-                f"[0]scale={scaled_w}:{scaled_h},setsar=1:1,"
+            return (
+                f"[{idx}:v]scale={scaled_w}:{scaled_h},setsar=1:1,{hold},"
                 f"crop={W}:{H}:{pan_x_expr}:{pan_y_expr},"
-                # normalize to target fps and bound duration
-                f"fps={fps},trim=duration={duration:.6f},setpts=PTS-STARTPTS[v]"
+                # normalize to target fps
+                f"fps={fps}[v{idx}]"
             )
     
         else:
-            filter_str = (
-                f"[0]scale={W}:{H},setsar=1:1,"
-                f"fps={fps},trim=duration={duration:.6f},setpts=PTS-STARTPTS[v]"
+            return (
+                f"[{idx}:v]scale={W}:{H},setsar=1:1,{hold},fps={fps}[v{idx}]"
             )
-    
-        cmd = [
-            self.ffmpeg_path, "-y",
-            "-loop", "1",
-            "-i", image_path,                     # no input-side -t or -r
-            "-filter_complex", filter_str,
+
+    def _group_command(
+        self,
+        jobs: List[tuple],
+        out_path: str,
+        threads: int = 0,
+        audio_path: Optional[str] = None,
+        captions_path: Optional[str] = None,
+    ) -> List[str]:
+        """
+        One ffmpeg command rendering a run of (image, duration, effect) jobs back to back:
+        every image is an input, each gets its own effect chain, and the `concat` filter
+        joins them before a single encode. Without audio/captions the result is VIDEO-ONLY;
+        with them the captions are burned onto the concat output and the audio mapped in
+        the same pass, so the frames are encoded exactly once.
+        """
+        inputs: List[str] = []
+        chains: List[str] = []
+        for idx, (img, dur, eff) in enumerate(jobs):
+            inputs.extend(["-i", img])            # decoded once: no -loop, -t or -r
+            chains.append(self._segment_chain(idx, dur, eff))
+        labels = "".join(f"[v{idx}]" for idx in range(len(jobs)))
+        subs = f",{self._caption_filter(captions_path)}" if captions_path else ""
+        chains.append(f"{labels}concat=n={len(jobs)}:v=1:a=0{subs}{self._hw_upload}[v]")
+
+        if audio_path:
+            inputs.extend(["-i", audio_path])
+            audio_args = ["-map", f"{len(jobs)}:a", *self._AUDIO_CODEC, "-shortest"]
+        else:
+            audio_args = ["-an"]
+
+        return [
+            *self._encode_head(threads),
+            *inputs,
+            "-filter_complex", ";".join(chains),
             "-map", "[v]",
-            "-c:v", "libx264", "-preset", "ultrafast", "-crf", "23", "-pix_fmt", "yuv420p",
-            "-an",                                 # video-only
+            *self._encode_args(threads),
+            *audio_args,
             out_path,
         ]
-        return self._run_ffmpeg(cmd, f"render image->video-only {os.path.basename(image_path)} ({duration:.3f}s)")
+
+    def _group_jobs(self, jobs: List[tuple]) -> List[List[tuple]]:
+        return [jobs[i : i + self._MAX_GRAPH_INPUTS] for i in range(0, len(jobs), self._MAX_GRAPH_INPUTS)]
+
+    def _pool_size(self, n_jobs: int, max_workers: Optional[int]) -> int:
+        workers = max_workers or min(n_jobs, os.cpu_count() or 1)
+        if self.hwaccel:
+            workers = min(workers, self._MAX_HW_WORKERS)
+        return max(1, min(workers, n_jobs))
+
+    def _run_commands(self, commands: List[tuple], workers: int) -> bool:
+        """
+        Run independent (cmd, description) ffmpeg jobs. With more than one worker they go to
+        a process pool; the first failure cancels whatever has not started yet.
+        """
+        if workers <= 1:
+            for cmd, description in commands:
+                if not self._run_ffmpeg(cmd, description):
+                    logger.error(f"{description} failed")
+                    return False
+            return True
+
+        # Submit at most `workers` jobs at a time: the pool hands submitted jobs to its
+        # processes eagerly, so anything submitted up front could no longer be cancelled
+        queued = iter(commands)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            running = {}
+
+            def _submit_next():
+                job = next(queued, None)
+                if job is not None:
+                    cmd, description = job
+                    running[pool.submit(_run_segment_worker, self.ffmpeg_path, cmd, description)] = description
+
+            for _ in range(workers):
+                _submit_next()
+            while running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    description = running.pop(fut)
+                    # workers report ffmpeg failure as False, not an exception
+                    if fut.exception() is not None or not fut.result():
+                        logger.error(f"{description} failed")
+                        # jobs already running finish when the pool exits; the rest never start
+                        return False
+                    _submit_next()
+        return True
+
+    def _render_groups(
+        self, groups: List[List[tuple]], max_workers: Optional[int] = None
+    ) -> Optional[List[str]]:
+        """
+        Render each group of (image, duration, effect) jobs to a VIDEO-ONLY part file, in
+        parallel. Used for slideshows too long for one graph (holding every decoded image
+        at once would need too much memory). Returns the part paths in order, or None.
+        """
+        workers = self._pool_size(len(groups), max_workers)
+        threads = max(1, (os.cpu_count() or 1) // workers) if workers > 1 else 0
+        part_paths = [os.path.join(self.workdir, f"part_{k:03d}.mp4") for k in range(len(groups))]
+        commands = [
+            (self._group_command(group, part, threads=threads), f"render image group {k} -> video-only")
+            for k, (group, part) in enumerate(zip(groups, part_paths))
+        ]
+        if not self._run_commands(commands, workers):
+            return None
+        return part_paths
 
     # ---------------------------
     # Final mux: add audio + (optionally) burn captions
@@ -206,33 +357,44 @@ class MultiImageVideoBuilder:
         # ffmpeg filter args: escape \  :  '
         return p.replace("\\", "\\\\").replace(":", "\\:").replace("'", "\\'")
 
+    def _caption_filter(self, captions_path: str) -> str:
+        """
+        Burn-in filter for `captions_path`. ASS/SSA scripts go straight to libass through
+        `ass`; `subtitles` would first decode them into subtitle packets and re-render
+        those as ASS events. Other formats (SRT, VTT) still need `subtitles`.
+        """
+        sub_abs = os.path.abspath(captions_path).replace("\\", "/")
+        name = "ass" if sub_abs.lower().endswith((".ass", ".ssa")) else "subtitles"
+        return f"{name}=filename='{self._escape_for_filter_path(sub_abs)}'"  # key + escaped path
+
     def _mux_audio_and_optional_captions(
         self,
-        video_only_path: str,
+        video_parts: List[str],
         audio_path: Optional[str],
         captions_path: Optional[str],
         out_path: str,
     ) -> bool:
         """
+        Join the VIDEO-ONLY parts and finish them in one pass: the concat demuxer feeds the
+        parts straight in as a single stream (no merged intermediate file is written).
         If captions provided: burn onto video; map audio from file.
         If no captions: just mux audio (no re-encode for video).
         """
 
         os.makedirs(os.path.dirname(os.path.abspath(out_path)) or ".", exist_ok=True)
+        video_input = ["-f", "concat", "-safe", "0", "-i", self._write_concat_list(video_parts)]
 
         if audio_path and captions_path:
-            sub_abs = os.path.abspath(captions_path).replace("\\", "/")
-            sub_esc = self._escape_for_filter_path(sub_abs)
-            filter_str = f"[0:v]subtitles=filename='{sub_esc}'[v]"  # key + escaped path
+            filter_str = f"[0:v]{self._caption_filter(captions_path)}{self._hw_upload}[v]"
 
             cmd = [
-                self.ffmpeg_path, "-y",
-                "-i", video_only_path,
+                *self._encode_head(),
+                *video_input,
                 "-i", audio_path,
                 "-filter_complex", filter_str,
                 "-map", "[v]", "-map", "1:a",
-                "-c:v", "libx264", "-preset", "ultrafast", "-crf", "23", "-pix_fmt", "yuv420p",
-                "-c:a", "aac", "-b:a", "192k",
+                *self._encode_args(),
+                *self._AUDIO_CODEC,
                 "-shortest",
                 out_path,
             ]
@@ -243,11 +405,11 @@ class MultiImageVideoBuilder:
             # Mux audio only; keep video as-is
             cmd = [
                 self.ffmpeg_path, "-y",
-                "-i", video_only_path,
+                *video_input,
                 "-i", audio_path,
                 "-map", "0:v", "-map", "1:a",
                 "-c:v", "copy",
-                "-c:a", "aac", "-b:a", "192k",
+                *self._AUDIO_CODEC,
                 "-shortest",
                 out_path,
             ]
@@ -255,19 +417,18 @@ class MultiImageVideoBuilder:
 
         if (not audio_path) and captions_path:
             # Burn subs only
-            sub = os.path.abspath(captions_path).replace("\\", "/")
             cmd = [
-                self.ffmpeg_path, "-y",
-                "-i", video_only_path,
-                "-vf", f"subtitles='{sub}'",
-                "-c:v", "libx264", "-preset", "ultrafast", "-crf", "23", "-pix_fmt", "yuv420p",
+                *self._encode_head(),
+                *video_input,
+                "-vf", f"{self._caption_filter(captions_path)}{self._hw_upload}",
+                *self._encode_args(),
                 out_path,
             ]
             return self._run_ffmpeg(cmd, "burn captions (no audio)")
 
-        # Neither audio nor captions: just copy
-        shutil.copy2(video_only_path, out_path)
-        return True
+        # Neither audio nor captions: join the parts as-is
+        cmd = [self.ffmpeg_path, "-y", *video_input, "-c", "copy", out_path]
+        return self._run_ffmpeg(cmd, "concat parts")
 
     # ---------------------------
     # Public API
@@ -284,11 +445,12 @@ class MultiImageVideoBuilder:
         effect_configs: Optional[List[Optional[dict]]] = None,
         temp_dir: Optional[str] = None,
         keep_temps: bool = False,
+        max_workers: Optional[int] = None,
     ) -> bool:
         """
-        1) Render each image -> VIDEO-ONLY segment (no audio).
-        2) Concatenate segments to one video-only file.
-        3) Add the full audio and burn captions in the final mux step.
+        Render all images in one ffmpeg graph (joined by `concat`), burning captions and
+        mapping the audio in the same pass. Slideshows longer than _MAX_GRAPH_INPUTS images
+        are rendered VIDEO-ONLY in groups first and get audio + captions in a final mux.
         """
         if not images:
             logger.error("No images provided")
@@ -316,30 +478,32 @@ class MultiImageVideoBuilder:
             else:
                 effects = [effect_config] * len(images)
 
-            # render segments (VIDEO-ONLY)
-            segment_paths: List[str] = []
-            for idx, (img, dur, eff) in enumerate(zip(images, durations, effects)):
-                seg_video = os.path.join(workdir, f"seg_{idx:03d}.mp4")
-                if not self._render_image_segment_video_only(img, float(dur), eff or {"effect": "ken_burns"}, seg_video):
-                    logger.error(f"segment {idx} render failed")
+            jobs = [
+                (img, float(dur), eff or {"effect": "ken_burns"})
+                for img, dur, eff in zip(images, durations, effects)
+            ]
+            os.makedirs(os.path.dirname(os.path.abspath(output_file)) or ".", exist_ok=True)
+
+            groups = self._group_jobs(jobs)
+            if len(groups) == 1:
+                # one pass: images -> concat -> captions, audio mapped alongside
+                cmd = self._group_command(jobs, output_file, audio_path=audio_file, captions_path=captions_file)
+                if not self._run_ffmpeg(cmd, f"render {len(jobs)} images + audio/captions"):
+                    return False
+            else:
+                # long slideshow: render image groups VIDEO-ONLY, then join + add audio/captions
+                parts = self._render_groups(groups, max_workers=max_workers)
+                if parts is None:
+                    logger.error("video-only render failed")
+                    return False
+                ok = self._mux_audio_and_optional_captions(
+                    video_parts=parts,
+                    audio_path=audio_file,
+                    captions_path=captions_file,
+                    out_path=output_file,
+                )
+                if not ok:
                     return False
-                segment_paths.append(seg_video)
-
-            # merge segments into one VIDEO-ONLY file
-            merged_vonly = os.path.join(workdir, "merged_vonly.mp4")
-            if not self._concat_videos(segment_paths, merged_vonly):
-                logger.error("concat of segments failed")
-                return False
-
-            # final mux: add audio + burn captions
-            ok = self._mux_audio_and_optional_captions(
-                video_only_path=merged_vonly,
-                audio_path=audio_file,
-                captions_path=captions_file,
-                out_path=output_file,
-            )
-            if not ok:
-                return False
 
             logger.info(f"video saved: {output_file}")
             return True
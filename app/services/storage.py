@@ -2,6 +2,11 @@ from typing import Tuple
 import uuid
 import os
 import requests
+from pathlib import Path
+
+# Root the file-serving routes may read from, resolved once at import; every
+# /file-style endpoint checks that the requested path is under it
+_ALLOWED_OUTPUT = Path("./output").resolve()
 
 
 class MediaType:
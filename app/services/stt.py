@@ -1,28 +1,48 @@
-from faster_whisper import WhisperModel
+from faster_whisper import BatchedInferencePipeline, WhisperModel
 import sys
+from functools import lru_cache
 from pathlib import Path
 from loguru import logger
-from app.services.config import device, whisper_model, whisper_compute_type
+from app.services.config import device, whisper_model, whisper_compute_type, whisper_cpu_threads
+
+
+@lru_cache(maxsize=1)
+def _get_whisper(model_size: str, compute_type: str, device_type: str) -> WhisperModel:
+    """Load the Whisper model once per process; every STT instance shares it."""
+    logger.bind(model_size=model_size, compute_type=compute_type, device=device_type).debug(
+        "loading Whisper model",
+    )
+    return WhisperModel(
+        model_size_or_path=model_size,
+        compute_type=compute_type,
+        cpu_threads=whisper_cpu_threads,
+        num_workers=1,
+    )
+
 
 class STT:
     def __init__(self):
-        self.model = WhisperModel(
-            model_size_or_path=whisper_model, 
-            compute_type=whisper_compute_type
-        )
+        self.model = _get_whisper(whisper_model, whisper_compute_type, device.type)
+        # Decodes VAD-split ~30s chunks in batches instead of one window at a time
+        self.pipeline = BatchedInferencePipeline(model=self.model)
 
-    def transcribe(self, audio_path, language = None, beam_size=5):
+    def transcribe(self, audio_path, language = None, beam_size=5, batch_size=16):
         logger.bind(
             device=device.type,
             model_size=whisper_model,
             compute_type=whisper_compute_type,
             audio_path=audio_path,
             language=language,
+            batch_size=batch_size,
         ).debug(
             "transcribing audio with Whisper model",
         )
-        segments, info = self.model.transcribe(
+        # VAD drops silent stretches before they reach the encoder (no spurious tokens on gaps)
+        segments, info = self.pipeline.transcribe(
             audio_path,
+            batch_size=batch_size,
+            vad_filter=True,
+            vad_parameters=dict(min_silence_duration_ms=500),
             beam_size=beam_size,
             word_timestamps=True,
             language=language,
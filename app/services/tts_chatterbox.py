@@ -1,4 +1,6 @@
+import contextlib
 import os
+import threading
 import time
 import traceback
 import warnings
@@ -13,6 +15,56 @@ from typing import List, Optional
 # Suppress PyTorch warnings
 warnings.filterwarnings("ignore")
 
+if device.type == "cuda":
+    # TF32 tensor-core matmuls for whatever autocast leaves in fp32
+    torch.backends.cuda.matmul.allow_tf32 = True
+
+
+def _autocast():
+    """Half-precision autocast on CUDA (bf16 where supported); other devices run as loaded."""
+    if device.type != "cuda":
+        return contextlib.nullcontext()
+    dtype = torch.bfloat16 if torch.cuda.is_bf16_supported() else torch.float16
+    return torch.autocast(device_type="cuda", dtype=dtype)
+
+# Loaded models by device type; from_pretrained takes seconds and GPU memory, so load once
+_MODEL_CACHE: dict[str, ChatterboxTTS] = {}
+_MODEL_LOCK = threading.Lock()
+# Built-in voice of each cached model (by id), restored when a request has no prompt
+_DEFAULT_CONDS: dict[int, object] = {}
+# Voice conditionals live on the shared model, so one text is generated at a time
+_GENERATE_LOCK = threading.Lock()
+
+
+def _get_model(device_type: str) -> ChatterboxTTS:
+    """Return the shared ChatterboxTTS model for `device_type`, loading it on first use."""
+    model = _MODEL_CACHE.get(device_type)
+    if model is None:
+        with _MODEL_LOCK:
+            model = _MODEL_CACHE.get(device_type)
+            if model is None:
+                logger.bind(device=device_type).debug("loading ChatterboxTTS model")
+                model = ChatterboxTTS.from_pretrained(device=device_type)
+                _DEFAULT_CONDS[id(model)] = model.conds
+                _MODEL_CACHE[device_type] = model
+    return model
+
+def _prepare_voice(model: ChatterboxTTS, audio_prompt_path: Optional[str], exaggeration: float) -> None:
+    """
+    Condition `model` on the voice prompt once for the whole text (model.generate would
+    otherwise reload and re-encode the prompt for every chunk), or restore the built-in
+    voice when there is no usable prompt: conditionals persist on the shared model.
+    Call with _GENERATE_LOCK held.
+    """
+    if audio_prompt_path and os.path.exists(audio_prompt_path):
+        model.prepare_conditionals(audio_prompt_path, exaggeration=exaggeration)
+        return
+    if audio_prompt_path:
+        logger.warning(f"Audio prompt path not found: {audio_prompt_path}")
+    default_conds = _DEFAULT_CONDS.get(id(model))
+    if default_conds is not None:
+        model.conds = default_conds
+
 class TTSChatterbox:
     def __init__(self):
         """Initialize ChatterboxTTS and ensure NLTK data is available."""
@@ -43,23 +95,24 @@ class TTSChatterbox:
             sentences = [sentence.strip() for sentence in sentences if sentence.strip()]
             
             chunks = []
-            current_chunk = ""
+            # Sentences of the chunk being built and its joined length; joined once on flush
+            current_parts: List[str] = []
+            current_len = 0
             
             for sentence in sentences:
                 # If adding this sentence would exceed the limit, finalize current chunk
-                if current_chunk and len(current_chunk) + len(sentence) + 1 > max_chars_per_chunk:
-                    chunks.append(current_chunk.strip())
-                    current_chunk = sentence
+                if current_parts and current_len + len(sentence) + 1 > max_chars_per_chunk:
+                    chunks.append(" ".join(current_parts))
+                    current_parts = [sentence]
+                    current_len = len(sentence)
                 else:
                     # Add sentence to current chunk
-                    if current_chunk:
-                        current_chunk += " " + sentence
-                    else:
-                        current_chunk = sentence
+                    current_len += len(sentence) + 1 if current_parts else len(sentence)
+                    current_parts.append(sentence)
             
             # Add the last chunk if it's not empty
-            if current_chunk.strip():
-                chunks.append(current_chunk.strip())
+            if current_parts:
+                chunks.append(" ".join(current_parts))
             
             logger.debug(f"Text split into {len(chunks)} chunks (max {max_chars_per_chunk} chars each, preserving sentences)")
             return chunks
@@ -90,13 +143,14 @@ class TTSChatterbox:
                 logger.warning(f"Audio prompt path not found: {audio_prompt_path}")
             
             # Generate audio
-            wav_tensor = model.generate(
-                text_chunk,
-                audio_prompt_path=effective_prompt_path,
-                temperature=temperature,
-                cfg_weight=cfg_weight,
-                exaggeration=exaggeration
-            )
+            with torch.inference_mode(), _autocast():
+                wav_tensor = model.generate(
+                    text_chunk,
+                    audio_prompt_path=effective_prompt_path,
+                    temperature=temperature,
+                    cfg_weight=cfg_weight,
+                    exaggeration=exaggeration
+                )
             
             # Ensure tensor is on CPU and properly shaped
             wav_tensor_cpu = wav_tensor.cpu().float()
@@ -120,6 +174,75 @@ class TTSChatterbox:
             logger.error(traceback.format_exc())
             return None
 
+    def _render_chunks(
+        self,
+        text_chunks: List[str],
+        model: ChatterboxTTS,
+        inter_chunk_silence_ms: int,
+        temperature: float,
+        cfg_weight: float,
+        exaggeration: float,
+    ) -> Optional[torch.Tensor]:
+        """Generate every chunk with the model's current voice and join them with silences."""
+        sample_rate = model.sr
+        n_chunks = len(text_chunks)
+        total_chars = sum(len(c) for c in text_chunks)
+        silence_samples = int(sample_rate * inter_chunk_silence_ms / 1000.0) if inter_chunk_silence_ms > 0 else 0
+        
+        # Chunks are copied into one zero-filled buffer as they are generated (the gaps
+        # left between them are the silences), so peak memory is the output size rather
+        # than every chunk plus their concatenation.
+        final_audio_tensor: Optional[torch.Tensor] = None
+        offset = 0
+        
+        logger.debug(f"Processing {n_chunks} chunks at {sample_rate} Hz")
+        
+        for i, chunk_text in enumerate(text_chunks):
+            logger.debug(f"Processing chunk {i+1}/{n_chunks}")
+            
+            # the voice is already conditioned; don't re-encode the prompt per chunk
+            chunk_tensor = self.generate_audio_chunk(
+                chunk_text,
+                model,
+                None,
+                temperature,
+                cfg_weight,
+                exaggeration
+            )
+            
+            if chunk_tensor is None:
+                logger.warning(f"Skipping chunk {i+1} due to generation error")
+                continue
+            
+            n_samples = chunk_tensor.shape[1]
+            # Add silence between chunks (except after the last chunk)
+            gap = silence_samples if i < n_chunks - 1 else 0
+            needed = offset + n_samples + gap
+            
+            if final_audio_tensor is None:
+                # Size the buffer from this chunk's samples per character, with headroom
+                per_char = n_samples / max(1, len(chunk_text))
+                estimate = int(per_char * total_chars * 1.2) + silence_samples * (n_chunks - 1)
+                final_audio_tensor = torch.zeros((1, max(estimate, needed)), dtype=chunk_tensor.dtype)
+            elif needed > final_audio_tensor.shape[1]:
+                grown = torch.zeros(
+                    (1, max(needed, final_audio_tensor.shape[1] * 3 // 2)),
+                    dtype=final_audio_tensor.dtype,
+                )
+                grown[:, :offset].copy_(final_audio_tensor[:, :offset])
+                final_audio_tensor = grown
+            
+            final_audio_tensor[:, offset:offset + n_samples].copy_(chunk_tensor)
+            offset = needed
+        
+        if final_audio_tensor is None:
+            logger.error("No audio tensors generated")
+            return None
+        
+        final_audio_tensor = final_audio_tensor[:, :offset]
+        logger.debug(f"Final audio shape: {final_audio_tensor.shape}")
+        return final_audio_tensor
+
     def text_to_speech_pipeline(
         self,
         text: str,
@@ -140,49 +263,11 @@ class TTSChatterbox:
                 logger.error("No text chunks to process")
                 return None
             
-            all_audio_tensors = []
-            sample_rate = model.sr
-            
-            logger.debug(f"Processing {len(text_chunks)} chunks at {sample_rate} Hz")
-            
-            for i, chunk_text in enumerate(text_chunks):
-                logger.debug(f"Processing chunk {i+1}/{len(text_chunks)}")
-                
-                chunk_tensor = self.generate_audio_chunk(
-                    chunk_text,
-                    model,
-                    audio_prompt_path,
-                    temperature,
-                    cfg_weight,
-                    exaggeration
+            with _GENERATE_LOCK:
+                _prepare_voice(model, audio_prompt_path, exaggeration)
+                return self._render_chunks(
+                    text_chunks, model, inter_chunk_silence_ms, temperature, cfg_weight, exaggeration
                 )
-                
-                if chunk_tensor is None:
-                    logger.warning(f"Skipping chunk {i+1} due to generation error")
-                    continue
-                
-                all_audio_tensors.append(chunk_tensor)
-                
-                # Add silence between chunks (except after the last chunk)
-                if i < len(text_chunks) - 1 and inter_chunk_silence_ms > 0:
-                    silence_samples = int(sample_rate * inter_chunk_silence_ms / 1000.0)
-                    silence_tensor = torch.zeros(
-                        (1, silence_samples),
-                        dtype=chunk_tensor.dtype,
-                        device=chunk_tensor.device
-                    )
-                    all_audio_tensors.append(silence_tensor)
-            
-            if not all_audio_tensors:
-                logger.error("No audio tensors generated")
-                return None
-            
-            # Concatenate all audio tensors
-            logger.debug("Concatenating audio tensors...")
-            final_audio_tensor = torch.cat(all_audio_tensors, dim=1)
-            
-            logger.debug(f"Final audio shape: {final_audio_tensor.shape}")
-            return final_audio_tensor
             
         except Exception as e:
             logger.error(f"Error in text-to-speech pipeline: {e}")
@@ -213,7 +298,7 @@ class TTSChatterbox:
             device=device.type,
         )
         context_logger.debug("starting TTS generation with Chatterbox")
-        model = ChatterboxTTS.from_pretrained(device=device.type)
+        model = _get_model(device.type)
 
         if sample_audio_path:
             wav = self.text_to_speech_pipeline(
@@ -237,10 +322,9 @@ class TTSChatterbox:
                 inter_chunk_silence_ms=chunk_silence_ms
             )
 
-        if wav.dim() == 2 and wav.shape[0] == 1:
-            wav = wav.repeat(2, 1)
-        elif wav.dim() == 1:
-            wav = wav.unsqueeze(0).repeat(2, 1)
+        # Chatterbox speaks mono; save it as-is rather than duplicating it to stereo
+        if wav.dim() == 1:
+            wav = wav.unsqueeze(0)
 
         audio_length = wav.shape[1] / model.sr
         ta.save(output_path, wav, model.sr)
@@ -330,8 +414,8 @@ if __name__ == "__main__":
         info = ta.info(str(out_wav))
         assert info.num_frames > 0, "Output WAV has zero frames"
         assert info.sample_rate > 0, "Invalid sample rate in output WAV"
-        # Expect 2 channels (the code duplicates mono to stereo)
-        assert info.num_channels in (1, 2), "Unexpected channel count in output WAV"
+        # Expect mono (Chatterbox output is saved without channel duplication)
+        assert info.num_channels == 1, "Unexpected channel count in output WAV"
         ok(f"TTS generated file: {out_wav.name} ({info.num_channels}ch @ {info.sample_rate} Hz, {info.num_frames} frames)")
 
     print("Running inline tests...\n")
@@ -1,15 +1,25 @@
+import os
 import re
 import time
+import queue
+import shutil
+import hashlib
+import tempfile
 import importlib
+import threading
 import warnings
-from typing import List
+import weakref
+from collections import OrderedDict
+from functools import lru_cache
+from typing import List, Optional
 from kokoro import KPipeline
 import numpy as np
 import soundfile as sf
 from loguru import logger
+import torch
 import torchaudio as ta
-from chatterbox.tts import ChatterboxTTS
 from app.services.config import device
+from app.services.tts_chatterbox import _GENERATE_LOCK, _autocast, _get_model, _prepare_voice
 
 # Suppress PyTorch warnings
 warnings.filterwarnings("ignore")
@@ -97,7 +107,208 @@ for lang, voices in LANGUAGE_VOICE_CONFIG.items():
             print(f"Warning: Language {lang} not found in LANGUAGE_CONFIG")
 
 
+# Language-specific sentence boundary patterns
+_SENTENCE_PATTERNS = {
+    "a": re.compile(r"(?<=[.!?])\s+(?=[A-Z_])"),  # English
+    "e": re.compile(r"(?<=[.!?])\s+(?=[A-ZÁÉÍÓÚÑÜ¿¡_])"),  # Spanish - allow inverted punctuation after boundaries
+    "f": re.compile(r"(?<=[.!?])\s+(?=[A-ZÁÀÂÄÇÉÈÊËÏÎÔÖÙÛÜŸ_])"),  # French
+    "h": re.compile(r"(?<=[।!?])\s+"),  # Hindi: Split after devanagari danda
+    "i": re.compile(r"(?<=[.!?])\s+(?=[A-ZÀÁÂÃÄÅÆÇÈÉÊËÌÍÎÏÐÑÒÓÔÕÖ×ØÙÚÛÜÝÞß_])"),  # Italian
+    "p": re.compile(r"(?<=[.!?])\s+(?=[A-ZÀÁÂÃÄÅÇÈÉÊËÌÍÎÏÑÒÓÔÕÖÙÚÛÜÝ_])"),  # Portuguese
+    "z": re.compile(r"(?<=[。！？])"),  # Chinese: Split after Chinese punctuation
+}
+
+# Common abbreviations that shouldn't trigger sentence breaks
+_ABBREVS = {
+    "a": {
+        "Mr.",
+        "Mrs.",
+        "Ms.",
+        "Dr.",
+        "Prof.",
+        "Sr.",
+        "Jr.",
+        "Inc.",
+        "Corp.",
+        "Ltd.",
+        "Co.",
+        "etc.",
+        "vs.",
+        "eg.",
+        "i.e.",
+        "e.g.",
+        "Vol.",
+        "Ch.",
+        "Fig.",
+        "No.",
+        "p.",
+        "pp.",
+    },  # English
+    "e": {
+        "Sr.",
+        "Sra.",
+        "Dr.",
+        "Dra.",
+        "Prof.",
+        "etc.",
+        "pág.",
+        "art.",
+        "núm.",
+        "cap.",
+        "vol.",
+    },  # Spanish
+    "f": {
+        "M.",
+        "Mme.",
+        "Dr.",
+        "Prof.",
+        "etc.",
+        "art.",
+        "p.",
+        "vol.",
+        "ch.",
+        "fig.",
+        "n°",
+    },  # French
+    "h": {"श्री", "श्रीमती", "डॉ.", "प्रो.", "etc.", "पृ.", "अध."},  # Hindi
+    "i": {
+        "Sig.",
+        "Sig.ra",
+        "Dr.",
+        "Prof.",
+        "ecc.",
+        "pag.",
+        "art.",
+        "n.",
+        "vol.",
+        "cap.",
+        "fig.",
+    },  # Italian
+    "p": {
+        "Sr.",
+        "Sra.",
+        "Dr.",
+        "Dra.",
+        "Prof.",
+        "etc.",
+        "pág.",
+        "art.",
+        "n.º",
+        "vol.",
+        "cap.",
+    },  # Portuguese
+    "z": {"先生", "女士", "博士", "教授", "等等", "第", "页", "章"},  # Chinese
+}
+
+# One alternation per language, longest first so "Mrs." wins over "Mr." and "pp." over "p."
+_ABBREV_RES = {
+    lang: re.compile("|".join(map(re.escape, sorted(abbrevs, key=len, reverse=True))))
+    for lang, abbrevs in _ABBREVS.items()
+}
+# Placeholders start with "_" (the boundary lookaheads treat them like the old "__ABBREV_i__"
+# ones) and are NUL-delimited so they cannot collide with anything in the text
+_ABBREV_PLACEHOLDER_RE = re.compile("_\x00\\d+\x00")
+
+
+@lru_cache(maxsize=16)
+def _get_pipeline(lang_code: str, device_str: str) -> KPipeline:
+    """One KPipeline (model weights + G2P tables) per language and device, reused across calls."""
+    logger.bind(lang_code=lang_code, device=device_str).debug("loading Kokoro pipeline")
+    return KPipeline(lang_code=lang_code, repo_id="hexgrad/Kokoro-82M", device=device_str)
+
+
+class _SynthesisCache:
+    """Most recently used Kokoro results, keyed on (text, voice, speed).
+
+    Each entry keeps the captions, the audio length and a copy of the WAV in a private
+    temp directory, so a repeated request is a file copy instead of a model run. The
+    directory is bounded by entry count and total bytes; WAVs larger than
+    `max_entry_bytes` (long narrations, unlikely to repeat) are not cached at all.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 128,
+        max_bytes: int = 256 * 1024 * 1024,
+        max_entry_bytes: int = 16 * 1024 * 1024,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self._entries: OrderedDict[str, tuple[List[dict], float, str, int]] = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self._dir = None
+        self._cleanup = None
+
+    @staticmethod
+    def _key(text: str, voice: str, speed) -> str:
+        return hashlib.md5(f"{text}|{voice}|{float(speed)}".encode("utf-8")).hexdigest()
+
+    def copy_to(self, text: str, voice: str, speed, output_path: str) -> Optional[tuple[List[dict], float]]:
+        """On a hit, copy the cached WAV to output_path and return (captions, length); else None."""
+        key = self._key(text, voice, speed)
+        # held across the copy so a concurrent put()/close() cannot delete the file under us
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            captions, length, cached_wav, size = entry
+            try:
+                shutil.copyfile(cached_wav, output_path)
+            except FileNotFoundError:
+                # removed behind our back (e.g. a temp cleaner); treat it as a miss
+                del self._entries[key]
+                self._total_bytes -= size
+                return None
+            self._entries.move_to_end(key)
+        # callers may edit the captions they get back
+        return [dict(c) for c in captions], length
+
+    def put(self, text: str, voice: str, speed, captions: List[dict], length: float, wav_path: str):
+        size = os.path.getsize(wav_path)
+        if size > self.max_entry_bytes:
+            return
+        key = self._key(text, voice, speed)
+        with self._lock:
+            if self._dir is None:
+                self._dir = tempfile.mkdtemp(prefix="kokoro-cache-")
+                # removed on close(), or at interpreter exit if close() is never called
+                self._cleanup = weakref.finalize(self, shutil.rmtree, self._dir, ignore_errors=True)
+            cached_wav = os.path.join(self._dir, f"{key}.wav")
+            shutil.copyfile(wav_path, cached_wav)
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._total_bytes -= old[3]
+            self._entries[key] = ([dict(c) for c in captions], length, cached_wav, size)
+            self._total_bytes += size
+            while len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes:
+                _, (_, _, evicted, evicted_size) = self._entries.popitem(last=False)
+                self._total_bytes -= evicted_size
+                try:
+                    os.remove(evicted)
+                except OSError:
+                    pass
+
+    def close(self) -> None:
+        """Forget every entry and delete the cache directory."""
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+            if self._cleanup is not None:
+                self._cleanup()
+            self._dir = None
+            self._cleanup = None
+
+
 class TTS:
+    def __init__(self):
+        self._cache = _SynthesisCache()
+
+    def close(self) -> None:
+        """Release the on-disk synthesis cache."""
+        self._cache.close()
+
     def break_text_into_sentences(self, text, lang_code) -> List[str]:
         """
         Advanced sentence splitting with better handling of abbreviations and edge cases.
@@ -105,122 +316,40 @@ class TTS:
         if not text or not text.strip():
             return []
 
-        # Language-specific sentence boundary patterns
-        patterns = {
-            "a": r"(?<=[.!?])\s+(?=[A-Z_])",  # English
-            "e": r"(?<=[.!?])\s+(?=[A-ZÁÉÍÓÚÑÜ¿¡_])",  # Spanish - allow inverted punctuation after boundaries
-            "f": r"(?<=[.!?])\s+(?=[A-ZÁÀÂÄÇÉÈÊËÏÎÔÖÙÛÜŸ_])",  # French
-            "h": r"(?<=[।!?])\s+",  # Hindi: Split after devanagari danda
-            "i": r"(?<=[.!?])\s+(?=[A-ZÀÁÂÃÄÅÆÇÈÉÊËÌÍÎÏÐÑÒÓÔÕÖ×ØÙÚÛÜÝÞß_])",  # Italian
-            "p": r"(?<=[.!?])\s+(?=[A-ZÀÁÂÃÄÅÇÈÉÊËÌÍÎÏÑÒÓÔÕÖÙÚÛÜÝ_])",  # Portuguese
-            "z": r"(?<=[。！？])",  # Chinese: Split after Chinese punctuation
-        }
-
-        # Common abbreviations that shouldn't trigger sentence breaks
-        abbreviations = {
-            "a": {
-                "Mr.",
-                "Mrs.",
-                "Ms.",
-                "Dr.",
-                "Prof.",
-                "Sr.",
-                "Jr.",
-                "Inc.",
-                "Corp.",
-                "Ltd.",
-                "Co.",
-                "etc.",
-                "vs.",
-                "eg.",
-                "i.e.",
-                "e.g.",
-                "Vol.",
-                "Ch.",
-                "Fig.",
-                "No.",
-                "p.",
-                "pp.",
-            },  # English
-            "e": {
-                "Sr.",
-                "Sra.",
-                "Dr.",
-                "Dra.",
-                "Prof.",
-                "etc.",
-                "pág.",
-                "art.",
-                "núm.",
-                "cap.",
-                "vol.",
-            },  # Spanish
-            "f": {
-                "M.",
-                "Mme.",
-                "Dr.",
-                "Prof.",
-                "etc.",
-                "art.",
-                "p.",
-                "vol.",
-                "ch.",
-                "fig.",
-                "n°",
-            },  # French
-            "h": {"श्री", "श्रीमती", "डॉ.", "प्रो.", "etc.", "पृ.", "अध."},  # Hindi
-            "i": {
-                "Sig.",
-                "Sig.ra",
-                "Dr.",
-                "Prof.",
-                "ecc.",
-                "pag.",
-                "art.",
-                "n.",
-                "vol.",
-                "cap.",
-                "fig.",
-            },  # Italian
-            "p": {
-                "Sr.",
-                "Sra.",
-                "Dr.",
-                "Dra.",
-                "Prof.",
-                "etc.",
-                "pág.",
-                "art.",
-                "n.º",
-                "vol.",
-                "cap.",
-            },  # Portuguese
-            "z": {"先生", "女士", "博士", "教授", "等等", "第", "页", "章"},  # Chinese
-        }
-
-        abbrevs = abbreviations.get(lang_code, set())
-
-        # Protect abbreviations by temporarily replacing them
+        # Protect abbreviations by temporarily replacing them (one pass over the text)
         protected_text = text
         replacements = {}
-        for i, abbrev in enumerate(abbrevs):
-            placeholder = f"__ABBREV_{i}__"
-            protected_text = protected_text.replace(abbrev, placeholder)
-            replacements[placeholder] = abbrev
-
-        # Apply the regex splitting
-        pattern = patterns.get(lang_code, patterns["a"])
-        sentences = re.split(pattern, protected_text.strip())
-
-        # Restore abbreviations and clean up
+        abbrev_re = _ABBREV_RES.get(lang_code)
+        if abbrev_re is not None:
+            def _protect(m: re.Match) -> str:
+                placeholder = f"_\x00{len(replacements)}\x00"
+                replacements[placeholder] = m.group(0)
+                return placeholder
+
+            protected_text = abbrev_re.sub(_protect, text)
+
+        def _restore(m: re.Match) -> str:
+            return replacements.get(m.group(0), m.group(0))
+
+        # Slice the text between boundary matches, restoring abbreviations and dropping
+        # empty pieces as we go (no intermediate list from re.split)
+        pattern = _SENTENCE_PATTERNS.get(lang_code, _SENTENCE_PATTERNS["a"])
+        protected_text = protected_text.strip()
         restored_sentences = []
-        for sentence in sentences:
-            for placeholder, original in replacements.items():
-                sentence = sentence.replace(placeholder, original)
+
+        def _add(sentence: str) -> None:
+            if replacements:
+                sentence = _ABBREV_PLACEHOLDER_RE.sub(_restore, sentence)
             sentence = sentence.strip()
             if sentence:
                 restored_sentences.append(sentence)
 
+        piece_start = 0
+        for m in pattern.finditer(protected_text):
+            _add(protected_text[piece_start:m.start()])
+            piece_start = m.end()
+        _add(protected_text[piece_start:])
+
         return restored_sentences if restored_sentences else [text.strip()]
 
     def kokoro_international(
@@ -245,36 +374,65 @@ class TTS:
             num_sentences=len(sentences),
         )
 
-        # generate the audio for each sentence
-        audio_data = []
+        # generate the audio for each sentence on this thread while a writer thread encodes
+        # the previous pieces to disk; the bounded queue keeps at most a few pieces in memory
         captions = []
         full_audio_length = 0
-        pipeline = KPipeline(lang_code=lang_code, repo_id="hexgrad/Kokoro-82M", device=device)
-        for sentence in sentences:
-            context_logger.debug(
-                "Processing sentence",
-                sentence=sentence,
-                voice=voice,
-                speed=speed,
-            )
-            generator = pipeline(sentence, voice=voice, speed=speed)
+        pipeline = _get_pipeline(lang_code, device.type)
+        pieces: queue.Queue = queue.Queue(maxsize=4)
+        write_errors = []
 
-            for i, result in enumerate(generator):
+        def _writer():
+            got_sentinel = False
+            try:
+                with sf.SoundFile(output_path, "w", 24000, 1, format="WAV") as wav_file:
+                    while (data := pieces.get()) is not None:
+                        wav_file.write(data)
+                    got_sentinel = True
+            except Exception as e:
+                write_errors.append(e)
+                # keep draining so the generating thread never blocks on a full queue; if
+                # closing the file failed the sentinel is already consumed and nothing follows
+                while not got_sentinel:
+                    got_sentinel = pieces.get() is None
+
+        writer = threading.Thread(target=_writer, name="kokoro-wav-writer", daemon=True)
+        writer.start()
+        try:
+            for sentence in sentences:
                 context_logger.debug(
-                    "Generated audio for sentence",
-                )
-                data = result.audio
-                audio_length = len(data) / 24000
-                audio_data.append(data)
-                # since there are no tokens, we can just use the sentence as the text
-                captions.append(
-                    {
-                        "text": sentence,
-                        "start_ts": full_audio_length,
-                        "end_ts": full_audio_length + audio_length,
-                    }
+                    "Processing sentence",
+                    sentence=sentence,
+                    voice=voice,
+                    speed=speed,
                 )
-                full_audio_length += audio_length
+                generator = pipeline(sentence, voice=voice, speed=speed)
+
+                for i, result in enumerate(generator):
+                    context_logger.debug(
+                        "Generated audio for sentence",
+                    )
+                    data = np.asarray(result.audio)
+                    audio_length = len(data) / 24000
+                    pieces.put(data)
+                    # since there are no tokens, we can just use the sentence as the text
+                    captions.append(
+                        {
+                            "text": sentence,
+                            "start_ts": full_audio_length,
+                            "end_ts": full_audio_length + audio_length,
+                        }
+                    )
+                    full_audio_length += audio_length
+                if write_errors:
+                    break
+        finally:
+            pieces.put(None)
+            writer.join()
+        if write_errors:
+            raise write_errors[0]
+        if not captions:
+            raise ValueError("Kokoro produced no audio")
 
         context_logger = context_logger.bind(
             execution_time=time.time() - start,
@@ -285,9 +443,6 @@ class TTS:
             "TTS generation (international) completed with kokoro",
         )
 
-        audio_data = np.concatenate(audio_data)
-        audio_data = np.column_stack((audio_data, audio_data))
-        sf.write(output_path, audio_data, 24000, format="WAV")
         return captions, full_audio_length
 
     def kokoro_english(
@@ -314,45 +469,45 @@ class TTS:
         context_logger.debug("Starting TTS generation with kokoro")
         if not text or not text.strip():
             raise ValueError("Text cannot be empty or whitespace")
-        pipeline = KPipeline(lang_code=lang_code, repo_id="hexgrad/Kokoro-82M", device=device.type)
+        pipeline = _get_pipeline(lang_code, device.type)
 
         generator = pipeline(text, voice=voice, speed=speed)
 
         captions = []
-        audio_data = []
         full_audio_length = 0
-        for _, result in enumerate(generator):
-            data = result.audio
-            audio_length = len(data) / 24000
-            audio_data.append(data)
-            if result.tokens:
-                tokens = result.tokens
-                for t in tokens:
-                    if t.start_ts is None or t.end_ts is None:
-                        if captions:
-                            captions[-1]["text"] += t.text
-                            captions[-1]["end_ts"] = full_audio_length + audio_length
-                        continue
-                    try:
-                        captions.append(
-                            {
-                                "text": t.text,
-                                "start_ts": full_audio_length + t.start_ts,
-                                "end_ts": full_audio_length + t.end_ts,
-                            }
-                        )
-                    except Exception as e:
-                        logger.error(
-                            "Error processing token: {}, Error: {}",
-                            t,
-                            e,
-                        )
-                        raise ValueError(f"Error processing token: {t}, Error: {e}")
-            full_audio_length += audio_length
-
-        audio_data = np.concatenate(audio_data)
-        audio_data = np.column_stack((audio_data, audio_data))
-        sf.write(output_path, audio_data, 24000, format="WAV")
+        # each generated piece goes straight to disk (mono, as Kokoro speaks it); the
+        # waveform is never held in full
+        with sf.SoundFile(output_path, "w", 24000, 1, format="WAV") as wav_file:
+            for _, result in enumerate(generator):
+                data = np.asarray(result.audio)
+                audio_length = len(data) / 24000
+                wav_file.write(data)
+                if result.tokens:
+                    tokens = result.tokens
+                    for t in tokens:
+                        if t.start_ts is None or t.end_ts is None:
+                            if captions:
+                                captions[-1]["text"] += t.text
+                                captions[-1]["end_ts"] = full_audio_length + audio_length
+                            continue
+                        try:
+                            captions.append(
+                                {
+                                    "text": t.text,
+                                    "start_ts": full_audio_length + t.start_ts,
+                                    "end_ts": full_audio_length + t.end_ts,
+                                }
+                            )
+                        except Exception as e:
+                            logger.error(
+                                "Error processing token: {}, Error: {}",
+                                t,
+                                e,
+                            )
+                            raise ValueError(f"Error processing token: {t}, Error: {e}")
+                full_audio_length += audio_length
+        if not full_audio_length:
+            raise ValueError("Kokoro produced no audio")
         context_logger.bind(
             execution_time=time.time() - start,
             audio_length=full_audio_length,
@@ -371,10 +526,19 @@ class TTS:
         lang_code = LANGUAGE_VOICE_MAP.get(voice, {}).get("lang_code")
         if not lang_code:
             raise ValueError(f"Voice '{voice}' not found in LANGUAGE_VOICE_MAP")
+        cached = self._cache.copy_to(text, voice, speed, output_path)
+        if cached is not None:
+            captions, length = cached
+            logger.bind(voice=voice, speed=speed, text_length=len(text)).debug(
+                "TTS result served from cache"
+            )
+            return captions, length
         if lang_code == "a":
-            return self.kokoro_english(text, output_path, voice, speed)
+            captions, length = self.kokoro_english(text, output_path, voice, speed)
         else:
-            return self.kokoro_international(text, output_path, voice, lang_code, speed)
+            captions, length = self.kokoro_international(text, output_path, voice, lang_code, speed)
+        self._cache.put(text, voice, speed, captions, length, output_path)
+        return captions, length
 
     def chatterbox(
         self,
@@ -397,23 +561,18 @@ class TTS:
             device=device.type,
         )
         context_logger.debug("starting TTS generation with Chatterbox")
-        model = ChatterboxTTS.from_pretrained(device=device.type)
-
-        if sample_audio_path:
-            wav = model.generate(
-                text,
-                audio_prompt_path=sample_audio_path,
-                exaggeration=exaggeration,
-                cfg_weight=cfg_weight,
-                temperature=temperature,
-            )
-        else:
-            wav = model.generate(
-                text,
-                exaggeration=exaggeration,
-                cfg_weight=cfg_weight,
-                temperature=temperature,
-            )
+        # the same model, voice state and lock as TTSChatterbox, so both paths share one copy
+        model = _get_model(device.type)
+        with _GENERATE_LOCK:
+            _prepare_voice(model, sample_audio_path, exaggeration)
+            with torch.inference_mode(), _autocast():
+                wav = model.generate(
+                    text,
+                    exaggeration=exaggeration,
+                    cfg_weight=cfg_weight,
+                    temperature=temperature,
+                )
+        wav = wav.cpu().float()
 
         if wav.dim() == 2 and wav.shape[0] == 1:
             wav = wav.repeat(2, 1)
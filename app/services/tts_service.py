@@ -1,4 +1,5 @@
 import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from functools import partial
 from typing import Any, Dict
 
@@ -6,10 +7,23 @@ from typing import Any, Dict
 from app.services.tts import synthesize_speech
 
 class TTSService:
-    """Async wrapper around the blocking synthesize_speech() function."""
-    def __init__(self, default_outdir: str = "./output/audio", default_save_vtt: bool = True):
+    """
+    Async wrapper around the blocking synthesize_speech() function.
+
+    At most `max_concurrency` syntheses run at once, on the service's own worker
+    threads; further requests wait on the semaphore instead of competing for the
+    same cores or occupying the event loop's default executor.
+    """
+    def __init__(
+        self,
+        default_outdir: str = "./output/audio",
+        default_save_vtt: bool = True,
+        max_concurrency: int = 1,
+    ):
         self.default_outdir = default_outdir
         self.default_save_vtt = default_save_vtt
+        self._sem = asyncio.Semaphore(max_concurrency)
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="tts")
 
     async def synthesize(self, text: str, outdir: str | None = None, save_vtt: bool | None = None) -> Dict[str, Any]:
         loop = asyncio.get_running_loop()
@@ -19,4 +33,9 @@ class TTSService:
             outdir=outdir or self.default_outdir,
             save_vtt=self.default_save_vtt if save_vtt is None else save_vtt,
         )
-        return await loop.run_in_executor(None, fn)
\ No newline at end of file
+        async with self._sem:
+            return await loop.run_in_executor(self._executor, fn)
+
+    def close(self) -> None:
+        # Drop queued jobs; a synthesis already running finishes on its own thread
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -126,9 +126,13 @@ class JimengAIGenerator:
         return new_images
 
     async def close(self):
+        # Safe to call twice: /image_gen/shutdown closes early, lifespan closes again on exit
+        if self.playwright is None:
+            return
         await self.context.close()
         await self.browser.close()
         await self.playwright.stop()
+        self.page = self.context = self.browser = self.playwright = None
 
 async def main_test():
     print("Starting JimengAIGenerator async test...")
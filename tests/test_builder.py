@@ -61,8 +61,9 @@ def test_builder_image_with_audio_and_subs_builds_cmd(tmp_path):
     assert str(audio) in joined
     assert "subtitles=" in joined
     assert str(out) == cmd[-1]
-    # 有时长参数
-    assert "-t" in cmd
+    # 时长由滤镜图内的 trim / zoompan d= 控制，输入只解码一次
+    assert "-loop" not in cmd
+    assert ":d=" in joined
 
 def test_builder_video_background_without_audio_but_with_subs(tmp_path):
     bgv = tmp_path / "bg.mp4"
@@ -98,3 +99,131 @@ def test_execute_calls_mediautils_and_writes_file(tmp_path):
     ok = b.execute()
     assert ok
     assert out.exists() and out.stat().st_size > 0
+
+def test_execute_probes_audio_once(tmp_path):
+    bg = tmp_path / "bg.jpg"; bg.write_bytes(b"fake")
+    audio = tmp_path / "a.wav"; audio.write_bytes(b"wav")
+    out = tmp_path / "out.mp4"
+
+    calls = []
+    mu = _FakeMediaUtils(audio_duration=1.0)
+    orig = mu.get_audio_info
+    mu.get_audio_info = lambda p: calls.append(p) or orig(p)
+
+    b = VideoBuilder((320, 240))
+    b.set_media_utils(mu)
+    b.set_background_image(str(bg))
+    b.set_audio(str(audio))
+    b.set_output_path(str(out))
+
+    assert b.execute()
+    assert b.execute()
+    assert len(calls) == 1
+
+    # A fresh builder rendering the same unchanged file reuses the probe too
+    b2 = VideoBuilder((320, 240))
+    b2.set_media_utils(mu)
+    b2.set_background_image(str(bg))
+    b2.set_audio(str(audio))
+    b2.set_output_path(str(tmp_path / "out2.mp4"))
+    assert b2.execute()
+    assert len(calls) == 1
+
+def test_oversized_filtergraph_goes_to_script_file(tmp_path, monkeypatch):
+    bg = tmp_path / "bg.jpg"; bg.write_bytes(b"fake")
+    audio = tmp_path / "a.wav"; audio.write_bytes(b"wav")
+    out = tmp_path / "out.mp4"
+
+    b = VideoBuilder((320, 240))
+    monkeypatch.setattr(b, "_MAX_INLINE_FILTER", 10)
+    b.set_media_utils(_FakeMediaUtils(audio_duration=1.0))
+    b.set_background_image(str(bg))
+    b.set_audio(str(audio))
+    b.set_output_path(str(out))
+
+    cmd = b.build_command()
+    assert "-filter_complex" not in cmd
+    script = cmd[cmd.index("-filter_complex_script") + 1]
+    assert "zoompan=" in open(script, encoding="utf-8").read()
+
+    assert b.execute()
+    assert not os.path.exists(script)
+
+def test_hwaccel_uses_available_encoder_or_falls_back(tmp_path, monkeypatch):
+    from app.services import builder as builder_mod
+
+    bg = tmp_path / "bg.jpg"; bg.write_bytes(b"fake")
+    audio = tmp_path / "a.wav"; audio.write_bytes(b"wav")
+
+    def _cmd(available):
+        monkeypatch.setattr(builder_mod, "_ffmpeg_encoders", lambda _: frozenset(available))
+        b = VideoBuilder((320, 240), hwaccel="auto")
+        b.set_media_utils(_FakeMediaUtils(audio_duration=1.0))
+        b.set_background_image(str(bg))
+        b.set_audio(str(audio))
+        b.set_output_path(str(tmp_path / "out.mp4"))
+        return b.build_command()
+
+    cmd = _cmd({"libx264", "h264_nvenc"})
+    assert cmd[cmd.index("-c:v") + 1] == "h264_nvenc"
+
+    cmd = _cmd({"libx264"})
+    assert cmd[cmd.index("-c:v") + 1] == "libx264"
+
+def test_batch_execute_renders_all_outputs_in_one_process(tmp_path):
+    calls = []
+
+    class _Recording(_FakeMediaUtils):
+        def execute_ffmpeg_command(self, cmd, *args, **kwargs):
+            calls.append(cmd)
+            return super().execute_ffmpeg_command(cmd, *args, **kwargs)
+
+    mu = _Recording(audio_duration=1.0)
+    builders = []
+    for i in range(2):
+        bg = tmp_path / f"bg{i}.jpg"; bg.write_bytes(b"fake")
+        audio = tmp_path / f"a{i}.wav"; audio.write_bytes(b"wav")
+        b = VideoBuilder((320, 240))
+        b.set_media_utils(mu)
+        b.set_background_image(str(bg))
+        b.set_audio(str(audio))
+        b.set_output_path(str(tmp_path / f"out{i}.mp4"))
+        builders.append(b)
+
+    assert VideoBuilder.batch_execute(builders)
+    assert len(calls) == 1
+    cmd = calls[0]
+    graph = cmd[cmd.index("-filter_complex") + 1]
+    assert "[0:v]" in graph and "[2:v]" in graph
+    assert cmd[cmd.index("[o0]") + 2] == "1:a"
+    assert cmd[cmd.index("[o1]") + 2] == "3:a"
+    assert str(tmp_path / "out0.mp4") in cmd
+    assert cmd[-1] == str(tmp_path / "out1.mp4")
+
+class _CmdWritingMediaUtils(_FakeMediaUtils):
+    # Module-level so it pickles into the worker; the "video" is the ffmpeg command
+    def execute_ffmpeg_command(self, cmd, *_args, **_kwargs):
+        with open(cmd[-1], "w", encoding="utf-8") as f:
+            f.write("\n".join(cmd))
+        return True
+
+def test_batch_render_runs_builders_in_worker_processes(tmp_path):
+    builders = []
+    for i in range(3):
+        bg = tmp_path / f"bg{i}.jpg"; bg.write_bytes(b"fake")
+        audio = tmp_path / f"a{i}.wav"; audio.write_bytes(b"wav")
+        b = VideoBuilder((320, 240))
+        b.set_media_utils(_CmdWritingMediaUtils(audio_duration=1.0))
+        b.set_background_image(str(bg))
+        b.set_audio(str(audio))
+        b.set_output_path(str(tmp_path / f"out{i}.mp4"))
+        builders.append(b)
+
+    assert VideoBuilder.batch_render(builders, max_workers=2) == [True, True, True]
+    share = str(max(1, (os.cpu_count() or 1) // 2))
+    for i, b in enumerate(builders):
+        cmd = (tmp_path / f"out{i}.mp4").read_text(encoding="utf-8").splitlines()
+        # each worker's ffmpeg gets its share of the cores...
+        assert cmd[cmd.index("-threads") + 1] == share
+        # ...without changing the caller's builder
+        assert b.threads == 0
@@ -1,6 +1,6 @@
 import pytest
 from pathlib import Path
-from app.services.caption import Caption, convert_webvtt_to_ass
+from app.services.caption import Caption, convert_webvtt_to_ass, parse_webvtt_to_captions
 
 
 def test_is_punctuation_catches_cjk():
@@ -45,3 +45,29 @@ def test_convert_webvtt_to_ass(tmp_path: Path):
     assert Path(p).exists()
     txt = Path(p).read_text(encoding="utf-8")
     assert "[Events]" in txt and "\\pos(" in txt
+
+def test_format_time_carries_rounded_centiseconds():
+    cp = Caption()
+    assert cp.format_time(0) == "0:00:00.00"
+    assert cp.format_time(65.5) == "0:01:05.50"
+    # .998 rounds up into the next second instead of printing ".100"
+    assert cp.format_time(4039.998) == "1:07:20.00"
+
+def test_parse_webvtt_cues():
+    vtt = (
+        "WEBVTT\r\n\r\n"
+        "1\r\n00:00:00.000 --> 00:00:01.500 align:start\r\nhello\r\n  there \r\n\r\n"
+        "intro\r\n00:01.500 --> 00:00:03,000\r\nnamed cue\r\n\r\n"
+        "3\r\n00:00:03.000 --> 00:00:04.000\r\n\r\n"
+    )
+    assert parse_webvtt_to_captions(vtt) == [
+        {"text": "hello there", "start_ts": 0.0, "end_ts": 1.5},
+        {"text": "named cue", "start_ts": 1.5, "end_ts": 3.0},
+    ]
+
+def test_international_segments_keep_standalone_punctuation_with_word():
+    cp = Caption()
+    caps = [{"text": "Bonjour tout le monde ! Ça va ?", "start_ts": 0.0, "end_ts": 4.0}]
+    segs = cp.create_subtitle_segments_international(caps, max_length=21, lines=1)
+    lines = [line for seg in segs for line in seg["text"]]
+    assert lines == ["Bonjour tout le", "monde ! Ça va ?"]
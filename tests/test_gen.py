@@ -39,3 +39,14 @@ def test_gen_prompt_flow(test_app):
     assert r.status_code == 200
     assert r.json()["status"] == "ok"
     assert r.json()["images_downloaded"] == 2
+
+
+def test_gen_shutdown_closes_generators(test_app):
+    r = test_app.post("/image_gen/shutdown")
+    assert r.status_code == 200
+    assert r.json()["status"] == "ok"
+    assert all(g.closed for g in test_app.app.state.gens)
+
+    # closed generators are not handed out again
+    r = test_app.post("/image_gen/submit")
+    assert r.status_code == 503
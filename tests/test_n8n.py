@@ -9,23 +9,55 @@ def test_upload_endpoints_write_files(test_app):
     payload = {"foo": "bar"}
 
     endpoints = [
-        ("upload", "transcript_generated.json"),
-        ("upload_kv_data", "kv_data.json"),
-        ("upload_kv_data_revised", "kv_data_revised.json"),
-        ("upload_data_w_prompt", "data_w_prompt.json"),
+        ("upload_transcript", "get_transcript", "transcript_generated.json"),
+        ("upload_kv_data", "get_kv_data", "kv_data.json"),
+        ("upload_kv_data_revised", "get_kv_data_revised", "kv_data_revised.json"),
+        ("upload_data_w_prompt", "get_data_w_prompt", "data_w_prompt.json"),
     ]
 
-    for ep, filename in endpoints:
+    paths = []
+    for ep, get_ep, filename in endpoints:
         r = test_app.post(f"/n8n/{ep}", json=payload)
         assert r.status_code == 200, r.text
         data = r.json()
         assert data["status"] == "success"
-        path = Path(data["path"])
+        assert Path(data["path"]).name == filename
+        paths.append(Path(data["path"]))
+
+        # Reads see the upload even before it is flushed to disk
+        r = test_app.get(f"/n8n/{get_ep}")
+        assert r.status_code == 200, r.text
+        assert r.json() == payload
+
+    test_app.portal.call(test_app.app.state.n8n_writer.flush)
+    for path in paths:
         assert path.exists()
         saved = json.loads(path.read_text(encoding="utf-8"))
         assert saved == payload
 
 
+def test_failed_buffered_write_stays_pending(test_app, monkeypatch):
+    from app.routers import n8n_api
+
+    real_write = n8n_api._safe_write_json
+
+    def _broken_write(rel_filename, data):
+        if rel_filename == "kv_data.json":
+            raise OSError("disk full")
+        return real_write(rel_filename, data)
+
+    monkeypatch.setattr(n8n_api, "_safe_write_json", _broken_write)
+    assert test_app.post("/n8n/upload_kv_data", json={"a": 1}).status_code == 200
+    assert test_app.post("/n8n/upload_transcript", json={"b": 2}).status_code == 200
+
+    writer = test_app.app.state.n8n_writer
+    test_app.portal.call(writer.flush)
+    # the failure is logged, not raised; the other file is still written
+    assert "kv_data.json" in writer
+    assert "transcript_generated.json" not in writer
+    assert Path("./output/n8n/transcript_generated.json").exists()
+
+
 def _epub_path() -> Path:
     # Resolve relative to this test file: tests/input_data/test1.epub
     return Path(__file__).parent / "input_data" / "think_and_grow_rich.epub"
@@ -0,0 +1,124 @@
+# tests/test_slideshow.py
+import os
+import time
+
+from app.services import slideshow_orchestrator as ss
+from app.services.slideshow_orchestrator import MultiImageVideoBuilder
+
+
+def _record_build(b, tmp_path, **kwargs):
+    cmds = []
+
+    def _run(cmd, _desc):
+        cmds.append(cmd)
+        return True
+
+    b._run_ffmpeg = _run
+    b.media.get_audio_info = lambda _: {"duration": 6.0}
+    ok = b.build(
+        images=[str(tmp_path / "a.png"), str(tmp_path / "b.png")],
+        audio_file=str(tmp_path / "a.wav"),
+        captions_file=str(tmp_path / "c.ass"),
+        output_file=str(tmp_path / "out.mp4"),
+        temp_dir=str(tmp_path / "work"),
+        **kwargs,
+    )
+    assert ok
+    return cmds
+
+
+def test_hwaccel_uses_available_encoder_or_falls_back(tmp_path, monkeypatch):
+    monkeypatch.setattr(ss, "_ffmpeg_encoders", lambda _: frozenset({"libx264", "h264_vaapi"}))
+    cmds = _record_build(MultiImageVideoBuilder((320, 240), hwaccel="auto"), tmp_path)
+    encodes = [c for c in cmds if "-c:v" in c and c[c.index("-c:v") + 1] != "copy"]
+    assert encodes and all(c[c.index("-c:v") + 1] == "h264_vaapi" for c in encodes)
+    assert all("-vaapi_device" in c for c in encodes)
+
+    monkeypatch.setattr(ss, "_ffmpeg_encoders", lambda _: frozenset({"libx264"}))
+    cmds = _record_build(MultiImageVideoBuilder((320, 240), hwaccel="nvenc"), tmp_path)
+    encodes = [c for c in cmds if "-c:v" in c and c[c.index("-c:v") + 1] != "copy"]
+    assert encodes and all(c[c.index("-c:v") + 1] == "libx264" for c in encodes)
+
+
+def test_audio_duration_probed_once_per_unchanged_file(tmp_path):
+    audio = tmp_path / "narration.wav"
+    audio.write_bytes(b"wav")
+    calls = []
+
+    def _builder():
+        b = MultiImageVideoBuilder((320, 240))
+        b.media.get_audio_info = lambda p: calls.append(p) or {"duration": 6.0}
+        return b
+
+    assert _builder()._get_audio_duration(str(audio)) == 6.0
+    assert _builder()._get_audio_duration(str(audio)) == 6.0
+    assert len(calls) == 1
+
+
+def _fake_segment_worker(_ffmpeg_path, cmd, _description):
+    # Runs in a worker process: record the command as the "rendered" segment
+    with open(cmd[-1], "w", encoding="utf-8") as f:
+        f.write("\n".join(cmd))
+    return True
+
+
+def _failing_first_worker(_ffmpeg_path, cmd, _description):
+    # ffmpeg failures come back as False, not as an exception
+    if cmd[0] == "fail":
+        return False
+    time.sleep(0.5)  # the failure is always seen before any good job finishes
+    open(cmd[-1], "w").close()
+    return True
+
+
+def test_first_failed_job_stops_the_rest(tmp_path, monkeypatch):
+    monkeypatch.setattr(ss, "_run_segment_worker", _failing_first_worker)
+    b = MultiImageVideoBuilder((320, 240))
+    outs = [str(tmp_path / f"{i}.mp4") for i in range(5)]
+    commands = [(["fail", outs[0]], "job 0")] + [(["ok", o], f"job {i}") for i, o in enumerate(outs) if i]
+    assert not b._run_commands(commands, workers=2)
+    # only the job started alongside the failing one may have run
+    assert sum(os.path.exists(o) for o in outs[2:]) == 0
+
+
+def test_images_audio_and_captions_render_in_one_pass(tmp_path):
+    cmds = _record_build(MultiImageVideoBuilder((320, 240)), tmp_path)
+    assert len(cmds) == 1
+    cmd = cmds[0]
+    graph = cmd[cmd.index("-filter_complex") + 1]
+    assert cmd.count("-i") == 3
+    assert "[v0][v1]concat=n=2:v=1:a=0,ass=filename=" in graph
+    assert cmd[cmd.index(str(tmp_path / "a.wav")) - 1] == "-i"
+    assert cmd[cmd.index("2:a") - 1] == "-map"
+    assert cmd[-1] == str(tmp_path / "out.mp4")
+    # a single render gets every core for the filter graph and the encoder
+    assert cmd[cmd.index("-threads") + 1] == "0"
+    assert cmd[cmd.index("-filter_threads") + 1] == str(os.cpu_count() or 4)
+
+
+def test_long_slideshows_render_groups_in_process_pool(tmp_path, monkeypatch):
+    monkeypatch.setattr(ss, "_run_segment_worker", _fake_segment_worker)
+    monkeypatch.setattr(MultiImageVideoBuilder, "_MAX_GRAPH_INPUTS", 2)
+    b = MultiImageVideoBuilder((320, 240))
+    b.workdir = str(tmp_path)
+    jobs = [(str(tmp_path / f"{i}.png"), 1.0, {"effect": "ken_burns"}) for i in range(3)]
+    parts = b._render_groups(b._group_jobs(jobs), max_workers=2)
+    assert len(parts) == 2
+    for part in parts:
+        cmd = open(part, encoding="utf-8").read().splitlines()
+        # each worker's ffmpeg gets its share of the cores
+        share = str(max(1, (os.cpu_count() or 1) // 2))
+        assert cmd[cmd.index("-threads") + 1] == share
+        assert cmd[cmd.index("-filter_complex_threads") + 1] == share
+
+
+def test_group_parts_feed_the_final_mux_without_a_merged_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(MultiImageVideoBuilder, "_MAX_GRAPH_INPUTS", 1)
+    cmds = _record_build(MultiImageVideoBuilder((320, 240)), tmp_path, keep_temps=True)
+    *renders, mux = cmds
+    assert len(renders) == 2
+    list_file = mux[mux.index("concat") + 4]
+    assert mux[mux.index("concat") - 1] == "-f"
+    listed = open(list_file, encoding="utf-8").read()
+    assert all(os.path.abspath(r[-1]).replace("\\", "/") in listed for r in renders)
+    assert not any("merged" in arg for c in cmds for arg in c)